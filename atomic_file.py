@@ -0,0 +1,58 @@
+import os
+import time
+
+import instrumentation
+
+PARTIAL_SUFFIX = '.partial'
+STALE_AFTER = 60  # seconds; no write takes this long, so an older partial file is a crash leftover
+
+
+def write_atomic(path, data):
+    """Replace path with data (str or bytes) so a crash leaves either the old or the new file"""
+    write_atomic_many({path: data})
+
+
+def write_atomic_many(files):
+    """write_atomic for {path: data}, sharing one directory fsync per folder"""
+    folders = set()
+    instrumentation.count('atomic.files_written', len(files))
+    for path, data in files.items():
+        tmp_path = f"{path}.{os.getpid()}{PARTIAL_SUFFIX}"
+        # Text goes through open() like the in-place writes did, so encodings and newlines match
+        with open(tmp_path, 'w' if isinstance(data, str) else 'wb') as f:
+            f.write(data)
+            instrumentation.count('atomic.bytes_written', len(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        folders.add(os.path.dirname(os.path.abspath(path)))
+    for folder in folders:
+        fsync_dir(folder)
+
+
+def fsync_dir(folder):
+    # Makes the rename itself durable; Windows cannot open a directory for this
+    if os.name == 'nt':
+        return
+    fd = os.open(folder, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def recover(folder):
+    """Delete temp files left behind by writes that crashed before their rename; returns their names"""
+    removed = []
+    now = time.time()
+    for name in os.listdir(folder):
+        if not name.endswith(PARTIAL_SUFFIX):
+            continue
+        path = os.path.join(folder, name)
+        try:
+            if now - os.path.getmtime(path) > STALE_AFTER:
+                os.remove(path)
+                removed.append(name)
+        except FileNotFoundError:
+            pass
+    return removed
@@ -0,0 +1,93 @@
+"""Several processes stopping sessions into one records.txt at the same time.
+
+Run from the repository root:
+
+    python -m benchmarks.concurrent_writers [--writers 4] [--sessions 2000] [--compact-every 500]
+
+Each writer process appends its own numbered records through RecordStore, reads
+day totals every few appends, and one of them compacts the journal now and then.
+Afterwards every record must be present exactly once and the indexed totals must
+match a full rescan. Prints per-append latency and lock waits; exits 1 on any loss.
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import core
+from record_store import RecordStore
+
+BASE_TIMESTAMP = 1752480000.0  # 2025-07-14, local time varies but stays within two days
+
+
+def writer(index, path, sessions, compact_every, results):
+    store = RecordStore(path)
+    samples = []
+    for i in range(sessions):
+        t0 = time.perf_counter()
+        store.append(f"writer-{index}", BASE_TIMESTAMP + i * 0.5 + index / 100, i)
+        samples.append(time.perf_counter() - t0)
+        if i % 50 == 0:
+            store.day_totals('20250714')
+        if index == 0 and compact_every and i and i % compact_every == 0:
+            store.compact()
+    store.close()
+    results.put((index, samples, store._file_lock.stats()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--compact-every", type=int, default=500)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="tico-concurrent-")
+    path = os.path.join(folder, core.RECORDS_FILE)
+    try:
+        results = multiprocessing.Queue()
+        start = time.perf_counter()
+        procs = [multiprocessing.Process(target=writer, args=(i, path, args.sessions, args.compact_every, results))
+                 for i in range(args.writers)]
+        for p in procs:
+            p.start()
+        reports = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        samples = sorted(s for _, writer_samples, _ in reports for s in writer_samples)
+        max_wait = max(stats["max_wait_ms"] for _, _, stats in reports)
+        print(f"{args.writers} writers x {args.sessions} sessions in {elapsed:.2f} s "
+              f"({len(samples) / elapsed:.0f} appends/s)")
+        print(f"append median={statistics.median(samples) * 1000:.2f} ms "
+              f"p99={samples[int(len(samples) * 0.99) - 1] * 1000:.2f} ms max={samples[-1] * 1000:.2f} ms")
+        print(f"lock wait max={max_wait:.2f} ms")
+
+        store = RecordStore(path)
+        records = list(store.iter_records())
+        expected = {(f"writer-{w}", i) for w in range(args.writers) for i in range(args.sessions)}
+        found = [(pid, secs) for pid, _, secs in records]
+        lost = expected - set(found)
+        duplicated = len(found) - len(set(found))
+        rescanned = core.totals_by_project(records)
+        indexed = {}
+        for day in store.days():
+            for pid, secs in store.day_totals(day).items():
+                indexed[pid] = indexed.get(pid, 0) + secs
+        store.close()
+
+        print(f"records={len(records)} expected={len(expected)} lost={len(lost)} duplicated={duplicated} "
+              f"index {'matches' if indexed == rescanned else 'DIFFERS FROM'} rescan")
+        if lost or duplicated or indexed != rescanned:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Keystroke latency and records written under bursts of hotkey switches.
+
+Run from the repository root:
+
+    python -m benchmarks.hotkey_burst [--bursts 20] [--switches 60] [--projects 9]
+
+Each burst presses --switches project hotkeys in a row through the real
+TimeTracker.handle_hotkey on a Tk-less tracker, with 50-1500 ms between presses
+(simulated by back-dating the running session). It runs twice:
+
+    immediate   every finished session is committed on the spot (the old Stop path)
+    coalesced   sessions wait in the SwitchBuffer and are committed once per burst
+
+and prints the per-keystroke p50/p99/max, the time the commits took and how
+many records reached records.txt.
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.suite import NullTicker, Var, close_tracker, generate, headless_tracker
+from switch_buffer import SwitchBuffer
+
+
+class InlineTicker:
+    """Runs a job as soon as it is registered, like a tick with nothing else queued"""
+
+    def register(self, name, job):
+        job()
+
+    def unregister(self, name):
+        pass
+
+    def wake(self):
+        pass
+
+
+class Key:
+    def __init__(self, char):
+        self.char = char
+        self.widget = None
+
+
+def record_count(folder):
+    with open(os.path.join(folder, "records.txt"), 'r') as f:
+        return sum(1 for _ in f)
+
+
+def measure(mode, args):
+    folder = tempfile.mkdtemp()
+    try:
+        generate(folder, records=1000, projects=args.projects, days=30, session_files=30, seed=1)
+        tracker = headless_tracker(folder)
+        tracker.project_var = Var()
+        if mode == "immediate":
+            tracker.ticker = InlineTicker()
+            tracker.switches = SwitchBuffer(window=0)
+        else:
+            tracker.ticker = NullTicker()
+        before = record_count(folder)
+        keys = [str(i) for i in range(1, min(args.projects, 9) + 1)]
+
+        rng = random.Random(3)
+        samples, commit_seconds = [], 0.0
+        for _ in range(args.bursts):
+            for _ in range(args.switches):
+                if tracker.is_tracking:
+                    tracker.start_time -= timedelta(milliseconds=rng.randint(50, 1500))
+                event = Key(rng.choice(keys))
+                t0 = time.perf_counter()
+                tracker.handle_hotkey(event)
+                samples.append(time.perf_counter() - t0)
+            tracker.stop_timer()
+            # The burst is over: commit what the switch window still holds and wait for the disk
+            t0 = time.perf_counter()
+            tracker.sync()
+            commit_seconds += time.perf_counter() - t0
+
+        stats = tracker.switches.stats()
+        close_tracker(tracker)
+        samples.sort()
+        return {
+            "mode": mode,
+            "p50_ms": statistics.median(samples) * 1000,
+            "p99_ms": samples[int(len(samples) * 0.99) - 1] * 1000,
+            "max_ms": samples[-1] * 1000,
+            "commit_ms": commit_seconds * 1000,
+            "records": record_count(folder) - before,
+            "commits": stats["commits"],
+        }
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--switches", type=int, default=60)
+    parser.add_argument("--projects", type=int, default=9)
+    args = parser.parse_args()
+
+    print(f"{'mode':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'commit ms':>10} {'records':>8} {'commits':>8}")
+    for mode in ("immediate", "coalesced"):
+        r = measure(mode, args)
+        print(f"{r['mode']:>10} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['max_ms']:>8.3f} "
+              f"{r['commit_ms']:>10.1f} {r['records']:>8} {r['commits']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Widget count and memory across repeated page switches.
+
+Run from the repository root (needs a display, e.g. under xvfb-run):
+
+    python -m benchmarks.page_switch [--switches 5000] [--dialog-cycles 500]
+
+Runs TimeTracker in a scratch folder, flips between the preview and timer pages
+and adds/deletes projects through the modify dialog. Widget count and traced
+memory should stay flat once the pages exist.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tkinter as tk
+import tracemalloc
+
+from widgets import count_widgets
+
+
+def snapshot(app, label, start):
+    app.root.update_idletasks()
+    current, peak = tracemalloc.get_traced_memory()
+    print(f"{label:>24} widgets={count_widgets(app.root):>5} "
+          f"mem={current / 1024:>9.1f} KiB peak={peak / 1024:>9.1f} KiB t={time.perf_counter() - start:>7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--switches", type=int, default=5000)
+    parser.add_argument("--dialog-cycles", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        from counter import TimeTracker
+        try:
+            app = TimeTracker()
+        except tk.TclError as e:
+            print(f"Tk is unavailable here ({e}); run under a display or xvfb-run")
+            return
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        snapshot(app, "start", start)
+        step = max(1, args.switches // 5)
+        for i in range(1, args.switches + 1):
+            app.show_timer_page()
+            app.show_preview_page()
+            if i % step == 0:
+                snapshot(app, f"{i} switches", start)
+
+        app.show_modify_dialog()
+        step = max(1, args.dialog_cycles // 5)
+        for i in range(1, args.dialog_cycles + 1):
+            app.add_project(f"Bench {i}", "9")
+            app.delete_project([app.project_data.id_by_name(f"Bench {i}")])
+            if i % step == 0:
+                snapshot(app, f"{i} add/delete", start)
+        app.root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Type-ahead search latency over a large project catalog.
+
+Run from the repository root:
+
+    python -m benchmarks.project_search [--projects 50000]
+
+Times ProjectRegistry.search for every prefix of a few typed names, plus taking
+the visible window of rows, which is all a keystroke costs the project pickers.
+A frame at 60 Hz is 16.7 ms.
+"""
+import argparse
+import random
+import statistics
+import string
+import time
+import uuid
+
+from project_registry import ProjectRegistry
+
+VISIBLE_ROWS = 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=50_000)
+    args = parser.parse_args()
+
+    names = {f"{random.choice(['ACME', 'Internal', 'Support', 'Ticket'])}-{i} "
+             f"{''.join(random.choices(string.ascii_lowercase, k=6))}" for i in range(args.projects)}
+    start = time.perf_counter()
+    registry = ProjectRegistry({str(uuid.uuid4()): (name, '') for name in names})
+    registry.search('')
+    print(f"build {len(registry)} projects + index: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    samples = []
+    for typed in random.sample(sorted(names), 20):
+        for end in range(len(typed) + 1):
+            t0 = time.perf_counter()
+            matches = registry.search(typed[:end])
+            rows = [registry.name(pid) for pid in matches[:VISIBLE_ROWS]]
+            samples.append(time.perf_counter() - t0)
+            assert not rows or rows[0].casefold().startswith(typed[:end].casefold())
+    samples.sort()
+    print(f"keystrokes={len(samples)} median={statistics.median(samples) * 1000:.3f} ms "
+          f"p99={samples[int(len(samples) * 0.99) - 1] * 1000:.3f} ms max={samples[-1] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Soak test: one instance left running through --days days of tracking.
+
+Run from the repository root:
+
+    python -m benchmarks.soak [--days 90] [--sessions 200] [--projects 9] [--max-growth-kib 128]
+
+A Tk-less TimeTracker runs on a simulated clock that starts --days days ago.
+Every day gets --sessions sessions through the real switch buffer and commit
+path, the last one still buffered when midnight passes, and the midnight tick
+(roll_over_day) runs late on every tenth day. After each day the Python heap is
+measured with tracemalloc, leaving out the session cache: it holds one entry per
+day's session log by design and is bounded by its max_entries. Each day's Daily_Summary file, and at the end
+records.txt with its archive, must hold exactly the simulated sessions, none
+lost or counted twice. Exits 1 if they don't, or if the heap grew by more than
+--max-growth-kib between the end of the first week and the last day.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import core
+import session_cache
+from benchmarks.suite import close_tracker, generate, headless_tracker
+from day_clock import DayClock
+
+
+class SimulatedClock:
+    def __init__(self, moment):
+        self.moment = moment
+
+    def __call__(self):
+        return self.moment
+
+
+def heap_sizes():
+    # (heap outside the session cache, session cache) in bytes
+    snapshot = tracemalloc.take_snapshot()
+    cached = tracemalloc.Filter(True, session_cache.__file__, all_frames=True)
+    total = sum(trace.size for trace in snapshot.traces)
+    cache = sum(trace.size for trace in snapshot.filter_traces([cached]).traces)
+    return total - cache, cache
+
+
+def run(args, folder):
+    generate(folder, records=100, projects=args.projects, days=1, session_files=1, seed=5)
+    first_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=args.days)
+    clock = SimulatedClock(first_day + timedelta(hours=8))
+
+    tracker = headless_tracker(folder)
+    tracker.clock = DayClock(now=clock)
+    project_ids = list(tracker.project_data)
+    rng = random.Random(11)
+
+    expected, expected_day = {}, {}  # {project name: seconds} over all days and of the current day
+    heap, rollover_ms, summaries_ok = [], [], True
+    for d in range(args.days):
+        day = first_day + timedelta(days=d)
+        # Sessions from 08:00, the last one ending just before midnight
+        moment = day + timedelta(hours=8)
+        step = (16 * 3600 - 60) / args.sessions
+        for i in range(args.sessions):
+            moment += timedelta(seconds=step)
+            clock.moment = moment
+            project_id = rng.choice(project_ids)
+            seconds = rng.randint(0, int(step))
+            tracker.switches.add(project_id, moment.timestamp(), seconds)
+            if seconds > 0:
+                name = tracker.project_data.name(project_id)
+                expected[name] = expected.get(name, 0) + seconds
+                expected_day[name] = expected_day.get(name, 0) + seconds
+            if i % 10 == 9 and i != args.sessions - 1:
+                tracker.commit_switches(force=True)
+
+        # Midnight; every tenth day the tick comes late and a commit sees the new date first
+        clock.moment = day + timedelta(days=1, seconds=1)
+        t0 = time.perf_counter()
+        if d % 10 == 9:
+            tracker.commit_switches(force=True)
+        tracker.roll_over_day()
+        rollover_ms.append((time.perf_counter() - t0) * 1000)
+        tracker.writer.sync()
+        summary = os.path.join(folder, f"Daily_Summary_{day.strftime('%Y%m%d')}.txt")
+        summaries_ok = summaries_ok and core.sum_session_times(summary) == expected_day
+        expected_day = {}
+        heap.append(heap_sizes())
+
+    tracker.sync()
+    archive_thread = tracker.storage.record_store._archive_thread
+    if archive_thread is not None:
+        archive_thread.join()
+
+    # Nothing lost or counted twice in records.txt and its archive
+    start, end = first_day.timestamp(), (first_day + timedelta(days=args.days)).timestamp()
+    recorded = core.name_totals(tracker.storage.range_totals(start, end), tracker.project_data)
+    records_ok = {name: seconds for name, seconds in recorded.items() if seconds} == expected
+    close_tracker(tracker)
+    return {
+        "records_ok": records_ok,
+        "summaries_ok": summaries_ok,
+        "rollovers": tracker.clock.rollovers,
+        "rollover_max_ms": max(rollover_ms),
+        "heap": heap,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=9)
+    parser.add_argument("--max-growth-kib", type=float, default=128.0)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    tracemalloc.start(25)
+    try:
+        result = run(args, folder)
+    finally:
+        tracemalloc.stop()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    heap = result["heap"]
+    for d in sorted({0, 6, 29, 59, len(heap) - 1}):
+        if d < len(heap):
+            print(f"day {d + 1:>3}: heap {heap[d][0] / 1024:>8.1f} KiB, session cache {heap[d][1] / 1024:>8.1f} KiB")
+    baseline = heap[min(6, len(heap) - 1)][0]
+    growth = (heap[-1][0] - baseline) / 1024
+    print(f"growth after the first week: {growth:.1f} KiB, slowest rollover: {result['rollover_max_ms']:.2f} ms")
+    print(f"rollovers: {result['rollovers']}, records correct: {result['records_ok']}, "
+          f"daily summaries correct: {result['summaries_ok']}")
+    if not (result["records_ok"] and result["summaries_ok"]) or growth > args.max_growth_kib:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Stop latency vs. records.txt size.
+
+Run from the repository root:
+
+    python -m benchmarks.stop_latency [--sizes 1000,10000,...] [--appends 200]
+
+Each size gets a synthetic journal of that many lines, then the time of
+RecordStore.append (what a Stop press costs) is measured. With the journal
+the median should stay flat from 1k to 10M lines.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from record_store import RecordStore
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def write_history(path, lines, projects=20):
+    project_ids = [str(uuid.uuid4()) for _ in range(projects)]
+    timestamp = time.time() - lines * 60
+    with open(path, 'w') as f:
+        chunk = []
+        for _ in range(lines):
+            timestamp += 60
+            chunk.append(f"{random.choice(project_ids)}|{timestamp}|{random.randint(1, 3600)}\n")
+            if len(chunk) >= 100_000:
+                f.writelines(chunk)
+                chunk.clear()
+        f.writelines(chunk)
+    return project_ids
+
+
+def measure(lines, appends):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "records.txt")
+        project_ids = write_history(path, lines)
+        store = RecordStore(path)
+        samples = []
+        for _ in range(appends):
+            start = time.perf_counter()
+            store.append(random.choice(project_ids), time.time(), random.randint(1, 3600))
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        return {
+            "lines": lines,
+            "median_ms": statistics.median(samples) * 1000,
+            "p95_ms": samples[int(len(samples) * 0.95) - 1] * 1000,
+            "max_ms": samples[-1] * 1000,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--appends", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'lines':>12} {'median ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    for lines in (int(size) for size in args.sizes.split(',')):
+        result = measure(lines, args.appends)
+        print(f"{result['lines']:>12} {result['median_ms']:>10.3f} {result['p95_ms']:>10.3f} {result['max_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+"""Headless scale and fault-injection benchmarks for the persistence and report paths.
+
+Run from the repository root:
+
+    python -m benchmarks.suite [--records 10000,1000000] [--output results.json] [--compare baseline.json]
+
+For each size a synthetic data folder is generated (seeded, so runs are
+reproducible): projects.txt, a records.txt spread over --days days ending today,
+and the same sessions logged across --session-files per-run session files, as
+older versions wrote them; their migration into day logs is timed too. The real
+TimeTracker methods (stop_timer, generate_report, ...) are then
+timed on a Tk-less TimeTracker, plus recovery from injected faults. Each case is
+run --repeat times for the timing and once more under tracemalloc for peak memory.
+
+Results go to --output as JSON. With --compare, cases more than --tolerance times
+slower than in the baseline file are listed and the exit status is 1.
+"""
+import argparse
+import heapq
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+import core
+import instrumentation
+import session_log
+from counter import TimeTracker
+from persistence import WriteBehind
+from project_registry import ProjectRegistry
+from record_store import RecordStore
+from storage import TextStorage
+from tick_scheduler import TickScheduler
+from switch_buffer import SwitchBuffer
+from day_clock import DayClock
+
+
+class NullWidget:
+    """Stands in for the Tk widgets stop_timer updates"""
+
+    def config(self, **options):
+        pass
+
+
+class NullTicker:
+    """Stands in for the TickScheduler; deferred jobs run at sync()"""
+
+    def register(self, name, job):
+        pass
+
+    def unregister(self, name):
+        pass
+
+    def wake(self):
+        pass
+
+
+class Var:
+    """Stands in for a tk.StringVar"""
+
+    def __init__(self, value=''):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class FakeRoot:
+    """Stands in for the Tk root under a real TickScheduler: after() callbacks run in real time from run()"""
+
+    def __init__(self):
+        self._pending = []  # heap of (due, seq, callback)
+        self._cancelled = set()
+        self._seq = 0
+
+    def after(self, ms, callback):
+        self._seq += 1
+        heapq.heappush(self._pending, (time.monotonic() + ms / 1000, self._seq, callback))
+        return self._seq
+
+    def after_idle(self, callback):
+        return self.after(0, callback)
+
+    def after_cancel(self, after_id):
+        self._cancelled.add(after_id)
+
+    def run(self, seconds, until=None):
+        """Run due callbacks for up to seconds, or until until() is true; returns whether it became true"""
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if until is not None and until():
+                return True
+            while self._pending and self._pending[0][1] in self._cancelled:
+                self._cancelled.discard(heapq.heappop(self._pending)[1])
+            if self._pending and self._pending[0][0] <= time.monotonic():
+                heapq.heappop(self._pending)[2]()
+            else:
+                time.sleep(0.005)
+        return until is not None and until()
+
+
+def headless_tracker(folder):
+    """A TimeTracker with real storage, writer and records but no Tk window"""
+    tracker = TimeTracker.__new__(TimeTracker)
+    tracker.storage = TextStorage(folder)
+    tracker.writer = WriteBehind(tracker.storage)
+    tracker.switches = SwitchBuffer()
+    tracker.ticker = NullTicker()
+    tracker.clock = DayClock()
+    tracker.project_data = tracker.storage.load_projects()
+    tracker.session_log = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    tracker.current_project = None
+    tracker.start_time = None
+    tracker.is_tracking = False
+    tracker.start_button = tracker.stop_button = tracker.project_dropdown = tracker.timer_label = NullWidget()
+    return tracker
+
+
+def close_tracker(tracker):
+    tracker.commit_switches(force=True)
+    tracker.writer.close()
+    tracker.storage.close()
+
+
+def generate(folder, records, projects, days, session_files, seed):
+    """Write a synthetic history; returns the project ids"""
+    rng = random.Random(seed)
+    registry = ProjectRegistry({str(uuid.UUID(int=rng.getrandbits(128))): (f"Project {i}", str(i) if i < 10 else '')
+                                for i in range(projects)})
+    registry.save(os.path.join(folder, core.PROJECTS_FILE))
+    project_ids = list(registry)
+    names = {pid: registry.name(pid) for pid in project_ids}
+
+    first_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    files_per_day = max(1, session_files // days)
+    step = days * 86400 / records
+    record_lines, session_lines = [], {}
+    for i in range(records):
+        when = first_day + timedelta(seconds=i * step)
+        pid = rng.choice(project_ids)
+        seconds = rng.randint(1, 3600)
+        record_lines.append(f"{pid}|{when.timestamp()}|{seconds}\n")
+        session = f"session_{when.strftime('%Y%m%d')}_{(i % files_per_day):06d}"
+        session_lines.setdefault(session, []).append(
+            f"{when.strftime('%Y-%m-%d %H:%M:%S')} - {names[pid]}: {core.format_time(seconds)}\n")
+        if len(record_lines) >= 100_000:
+            _flush(folder, record_lines, session_lines)
+    _flush(folder, record_lines, session_lines)
+
+    # Ship the day index too, as a folder that has been in use would have it
+    store = RecordStore(os.path.join(folder, core.RECORDS_FILE))
+    store.days()
+    store.close()
+    return project_ids
+
+
+def _flush(folder, record_lines, session_lines):
+    with open(os.path.join(folder, core.RECORDS_FILE), 'a') as f:
+        f.writelines(record_lines)
+    for session, lines in session_lines.items():
+        with open(os.path.join(folder, f"{session}.txt"), 'a') as f:
+            f.writelines(lines)
+    record_lines.clear()
+    session_lines.clear()
+
+
+# Each case takes the prepared folder and returns extra result fields (or None)
+
+def case_build_index(folder, args):
+    # First start after an upgrade, or after records.txt.idx was deleted
+    _remove(os.path.join(folder, core.RECORDS_FILE + '.idx'))
+    store = RecordStore(os.path.join(folder, core.RECORDS_FILE))
+    days = len(store.days())
+    store.close()
+    return {"days": days}
+
+
+def case_startup(folder, args):
+    # App start: open storage and load projects
+    tracker = headless_tracker(folder)
+    close_tracker(tracker)
+
+
+def case_stop_timer(folder, args):
+    # Rapid hotkey switching: what each Stop costs the UI thread, then the wait for the disk
+    tracker = headless_tracker(folder)
+    project_ids = list(tracker.project_data)
+    samples = []
+    for i in range(args.stops):
+        tracker.current_project = project_ids[i % len(project_ids)]
+        tracker.start_time = datetime.now() - timedelta(seconds=5)
+        tracker.is_tracking = True
+        t0 = time.perf_counter()
+        tracker.stop_timer()
+        samples.append(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    tracker.sync()
+    drain = time.perf_counter() - t0
+    close_tracker(tracker)
+    # Stops only buffer the session; the commit and the day's totals rebuild land in the drain
+    first, rest = samples[0], sorted(samples[1:]) or samples
+    return {"first_stop_ms": first * 1000, "stop_p50_ms": statistics.median(rest) * 1000,
+            "stop_p99_ms": rest[int(len(rest) * 0.99) - 1] * 1000, "drain_ms": drain * 1000}
+
+
+def case_tick_commit(folder, args):
+    # Stop hands the session to the real TickScheduler's 'commit' job, with the app's other jobs registered
+    tracker = headless_tracker(folder)
+    root = FakeRoot()
+    tracker.ticker = TickScheduler(root)
+    tracker.ticker.register('midnight', tracker.roll_over_day)
+    tracker.ticker.register('timer', tracker.update_timer)
+    root.run(0.05)  # the midnight job now has a tick pending for hours
+    tracker.project_var = Var(tracker.project_data.name(next(iter(tracker.project_data))))
+    tracker.start_timer()
+    label_ticked = root.run(2.5, until=lambda: (tracker.shown_seconds or 0) >= 2)
+
+    journal = os.path.join(folder, core.RECORDS_FILE)
+    size = os.path.getsize(journal)
+    tracker.start_time -= timedelta(seconds=5)
+    t0 = time.perf_counter()
+    tracker.stop_timer()
+    # The switch window, one tick and the writer's batch window; a second on top for a slow disk
+    limit = tracker.switches.window + tracker.writer.batch_window + 1.0
+    written = root.run(limit, until=lambda: os.path.getsize(journal) > size)
+    commit_ms = (time.perf_counter() - t0) * 1000
+    close_tracker(tracker)
+    return {"commit_ms": commit_ms, "correct": label_ticked and written}
+
+
+def case_save_records(folder, args):
+    # Durable appends without the writer thread, one per call
+    store = RecordStore(os.path.join(folder, core.RECORDS_FILE))
+    for i in range(args.stops):
+        store.append("bench", time.time(), i)
+    store.close()
+
+
+def case_sum_session_times(folder, args):
+    # Cold daily totals: today's session log, as the first daily_summary of a day reads it
+    tracker = headless_tracker(folder)
+    totals = tracker.storage.session_totals(datetime.now().strftime('%Y%m%d'))
+    files = len(session_log.segment_names(folder, datetime.now().strftime('%Y%m%d')))
+    close_tracker(tracker)
+    return {"projects": len(totals), "session_files": files}
+
+
+def case_session_month_restart(folder, args):
+    # Month of session logs read once, then again after a restart with one log still growing
+    month = datetime.now().strftime('%Y%m')
+    storage = TextStorage(folder)
+    t0 = time.perf_counter()
+    cold = storage.session_totals(month)
+    cold_s = time.perf_counter() - t0
+    storage.close()
+
+    with open(os.path.join(folder, session_log.segment_name(datetime.now().strftime('%Y%m%d'))), 'a') as f:
+        f.write(f"{datetime.now():%Y-%m-%d %H:%M:%S} - Project 0: 00:00:01\n")
+    storage = TextStorage(folder)
+    instrumentation.enable()
+    t0 = time.perf_counter()
+    warm = storage.session_totals(month)
+    warm_s = time.perf_counter() - t0
+    reparsed = instrumentation.snapshot()["counters"].get('session_cache.misses', 0)
+    instrumentation.disable()
+    instrumentation.reset()
+    storage.close()
+    return {"cold_ms": cold_s * 1000, "restart_ms": warm_s * 1000, "reparsed": reparsed,
+            "correct": warm.get("Project 0", 0) == cold.get("Project 0", 0) + 1}
+
+
+def case_generate_report(folder, args):
+    tracker = headless_tracker(folder)
+    tracker.generate_report()
+    tracker.sync()
+    close_tracker(tracker)
+
+
+def case_range_totals(folder, args):
+    # Arbitrary 30-day window: streamed through the day index, memory independent of history size
+    storage = TextStorage(folder)
+    end = time.time()
+    totals = storage.range_totals(end - 30 * 86400, end)
+    storage.close()
+    return {"projects": len(totals)}
+
+
+def case_archive(folder, args):
+    # Closed months moved out of records.txt, with an app start before and after
+    path = os.path.join(folder, core.RECORDS_FILE)
+    t0 = time.perf_counter()
+    tracker = headless_tracker(folder)
+    start_before = time.perf_counter() - t0
+    close_tracker(tracker)
+    store = RecordStore(path)
+    moved = store.archive(datetime.now().strftime('%Y%m'))
+    store.close()
+    t0 = time.perf_counter()
+    tracker = headless_tracker(folder)
+    start_after = time.perf_counter() - t0
+    close_tracker(tracker)
+    return {"archived": sum(moved.values()), "hot_kib": os.path.getsize(path) / 1024,
+            "start_before_ms": start_before * 1000, "start_after_ms": start_after * 1000}
+
+
+def case_corrupt_index(folder, args):
+    # Fault: a truncated records.txt.idx must be rebuilt, not trusted
+    path = os.path.join(folder, core.RECORDS_FILE)
+    with open(path + '.idx', 'r+') as f:
+        f.truncate(max(1, os.path.getsize(path + '.idx') // 2))
+    store = RecordStore(path)
+    month = datetime.now().strftime('%Y%m')
+    indexed = store.month_totals(month)
+    store.close()
+    rescanned = core.totals_by_project(r for r in RecordStore(path).iter_records()
+                                       if datetime.fromtimestamp(r[1]).strftime('%Y%m') == month)
+    return {"correct": indexed == rescanned}
+
+
+def case_torn_tail(folder, args):
+    # Fault: a crash left half a line at the end of records.txt
+    path = os.path.join(folder, core.RECORDS_FILE)
+    before = sum(1 for _ in RecordStore(path).iter_records())
+    with open(path, 'a') as f:
+        f.write("half-written|17")
+    store = RecordStore(path)
+    store.append("after-crash", time.time(), 1)
+    store.close()
+    after = list(RecordStore(path).iter_records())
+    return {"correct": len(after) == before + 1 and after[-1][0] == "after-crash"}
+
+
+def case_interrupted_saves(folder, args):
+    # Fault: temp files of saves that never got renamed, and an emptied projects.txt
+    for i in range(args.session_files):
+        partial = os.path.join(folder, f"Daily_Summary_{i}.txt.{i}.partial")
+        with open(partial, 'w') as f:
+            f.write("x")
+        os.utime(partial, (0, 0))
+    open(os.path.join(folder, core.PROJECTS_FILE), 'w').close()
+    messages = TextStorage(folder).recover()
+    return {"correct": len(messages) == args.session_files + 1}
+
+
+CASES = [
+    ("build_index", case_build_index),
+    ("startup", case_startup),
+    ("stop_timer", case_stop_timer),
+    ("tick_commit", case_tick_commit),
+    ("save_records", case_save_records),
+    ("sum_session_times", case_sum_session_times),
+    ("session_month_restart", case_session_month_restart),
+    ("generate_report", case_generate_report),
+    ("range_totals", case_range_totals),
+    ("archive", case_archive),
+    ("fault_corrupt_index", case_corrupt_index),
+    ("fault_torn_tail", case_torn_tail),
+    ("fault_interrupted_saves", case_interrupted_saves),
+]
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def run_case(template, func, args):
+    """Time func on fresh copies of the generated folder; returns (seconds, peak bytes, extra)"""
+    timings = []
+    extra = None
+    for _ in range(args.repeat):
+        folder = tempfile.mkdtemp(prefix="tico-suite-")
+        try:
+            shutil.copytree(template, folder, dirs_exist_ok=True)
+            t0 = time.perf_counter()
+            extra = func(folder, args)
+            timings.append(time.perf_counter() - t0)
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    peak = None
+    if not args.no_memory:
+        folder = tempfile.mkdtemp(prefix="tico-suite-")
+        try:
+            shutil.copytree(template, folder, dirs_exist_ok=True)
+            tracemalloc.start()
+            func(folder, args)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            shutil.rmtree(folder, ignore_errors=True)
+    return statistics.median(timings), peak, extra or {}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path, 'r') as f:
+        baseline = {(r["case"], r["records"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        old = baseline.get((result["case"], result["records"]))
+        if old and old["seconds"] > 0 and result["seconds"] / old["seconds"] > tolerance:
+            regressions.append((result, old))
+    for result, old in regressions:
+        print(f"REGRESSION {result['case']} @ {result['records']}: "
+              f"{old['seconds'] * 1000:.1f} ms -> {result['seconds'] * 1000:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", default="10000,100000,1000000")
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--session-files", type=int, default=2000)
+    parser.add_argument("--stops", type=int, default=200, help="hotkey switches per stop_timer/save_records run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cases", help="comma separated subset of: " + ", ".join(name for name, _ in CASES))
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--output", help="write JSON results here")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    selected = [(name, func) for name, func in CASES if not args.cases or name in args.cases.split(',')]
+    results = []
+    print(f"{'case':<24} {'records':>9} {'ms':>10} {'peak KiB':>10}  details")
+    for records in (int(size) for size in args.records.split(',')):
+        template = tempfile.mkdtemp(prefix="tico-history-")
+        try:
+            t0 = time.perf_counter()
+            generate(template, records, args.projects, args.days, args.session_files, args.seed)
+            print(f"{'(generate)':<24} {records:>9} {(time.perf_counter() - t0) * 1000:>10.1f}")
+            t0 = time.perf_counter()
+            migrated = session_log.migrate(template)
+            seconds = time.perf_counter() - t0
+            results.append({"case": "migrate_sessions", "records": records, "seconds": seconds, "files": migrated})
+            print(f"{'(migrate_sessions)':<24} {records:>9} {seconds * 1000:>10.1f} {'-':>10}  files={migrated}")
+            for name, func in selected:
+                seconds, peak, extra = run_case(template, func, args)
+                results.append({"case": name, "records": records, "seconds": seconds,
+                                "peak_bytes": peak, **extra})
+                details = " ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in extra.items())
+                print(f"{name:<24} {records:>9} {seconds * 1000:>10.1f} "
+                      f"{'-' if peak is None else f'{peak / 1024:.0f}':>10}  {details}")
+        finally:
+            shutil.rmtree(template, ignore_errors=True)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    failed = [r for r in results if r.get("correct") is False]
+    for r in failed:
+        print(f"FAILED {r['case']} @ {r['records']}")
+    if failed or (args.compare and compare(results, args.compare, args.tolerance)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Cost of durable (fsync + atomic rename) writes during rapid hotkey switching.
+
+Run from the repository root:
+
+    python -m benchmarks.switch_durability [--switches 300] [--interval-ms 0,20] [--budget-ms 16.7]
+
+Every switch stops a session, which appends a record, logs the session and
+rewrites the daily summary atomically. Measured twice: written synchronously on
+the caller's thread, and enqueued to WriteBehind as the UI does. Reports the
+caller-side latency and how many fsyncs each switch really costs; exits 1 if
+the write-behind p99 exceeds the budget (one 60 Hz frame by default).
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import core
+from persistence import WriteBehind
+from storage import TextStorage
+
+PROJECTS = ["Support", "Meetings", "Review", "Build"]
+
+fsync_calls = 0
+_real_fsync = os.fsync
+
+
+def counting_fsync(fd):
+    global fsync_calls
+    fsync_calls += 1
+    _real_fsync(fd)
+
+
+def switch_items(i, totals):
+    now = time.time()
+    name = PROJECTS[i % len(PROJECTS)]
+    totals[name] = totals.get(name, 0) + 1
+    logged_at = datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S')
+    day = datetime.fromtimestamp(now).strftime('%Y%m%d')
+    return ((f"id-{name}", now, 1), ("session_bench", logged_at, name, 1),
+            f"Daily_Summary_{day}", core.format_summary(totals))
+
+
+def run(switches, interval, batched):
+    global fsync_calls
+    with tempfile.TemporaryDirectory() as folder:
+        storage = TextStorage(folder)
+        writer = WriteBehind(storage) if batched else None
+        totals, samples = {}, []
+        fsync_calls = 0
+        start = time.perf_counter()
+        for i in range(switches):
+            record, entry, summary_name, summary = switch_items(i, totals)
+            t0 = time.perf_counter()
+            if batched:
+                writer.append_record(*record)
+                writer.log_session(*entry)
+                writer.write_summary(summary_name, summary)
+            else:
+                storage.append_records([record])
+                storage.log_sessions([entry])
+                storage.write_summaries({summary_name: summary})
+            samples.append(time.perf_counter() - t0)
+            if interval:
+                time.sleep(interval)
+        if batched:
+            writer.close()
+        elapsed = time.perf_counter() - start
+        storage.close()
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples) * 1000,
+        "p99_ms": samples[int(len(samples) * 0.99) - 1] * 1000,
+        "max_ms": samples[-1] * 1000,
+        "fsyncs_per_switch": fsync_calls / switches,
+        "batches": writer.batches if batched else switches,
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--switches", type=int, default=300)
+    parser.add_argument("--interval-ms", default="0,20")
+    parser.add_argument("--budget-ms", type=float, default=16.7)
+    args = parser.parse_args()
+
+    os.fsync = counting_fsync
+    over_budget = False
+    print(f"{'interval':>9} {'mode':>12} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'fsync/sw':>9} {'batches':>8}")
+    for interval_ms in (float(v) for v in args.interval_ms.split(',')):
+        for batched in (False, True):
+            r = run(args.switches, interval_ms / 1000, batched)
+            print(f"{interval_ms:>7.0f}ms {'write-behind' if batched else 'synchronous':>12} {r['p50_ms']:>8.3f} "
+                  f"{r['p99_ms']:>8.3f} {r['max_ms']:>8.3f} {r['fsyncs_per_switch']:>9.2f} {r['batches']:>8}")
+            if batched and r['p99_ms'] > args.budget_ms:
+                over_budget = True
+    if over_budget:
+        print(f"write-behind p99 is over the {args.budget_ms} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
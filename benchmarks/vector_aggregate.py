@@ -0,0 +1,92 @@
+"""NumPy vs pure-Python aggregation over a large binary records file.
+
+Run from the repository root (needs numpy installed):
+
+    python -m benchmarks.vector_aggregate [--records 1000000] [--projects 50] [--years 3] [--min-speedup 20]
+
+Writes a sorted binary_records.py file spanning --years of history, then times
+vector_aggregate.range_totals and period_totals (by day and by month) with and
+without NumPy, checks both paths agree, and prints the speedup. Exits 1 if any
+query is slower than --min-speedup times the pure-Python path.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+import vector_aggregate
+from binary_records import BinaryRecords
+
+
+def make_file(path, count, projects, years):
+    rng = random.Random(7)
+    project_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(projects)]
+    end = time.time()
+    start = end - years * 365 * 86400
+    step = (end - start) / count
+    records = [(rng.choice(project_ids), start + i * step, rng.randint(1, 3600)) for i in range(count)]
+    BinaryRecords.create(path, records)
+    return start, end
+
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-speedup", type=float, default=20.0)
+    args = parser.parse_args()
+
+    numpy = vector_aggregate.np
+    if numpy is None:
+        sys.exit("numpy is not installed; nothing to compare")
+
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "records.bin")
+    try:
+        start, end = make_file(path, args.records, args.projects, args.years)
+        records = BinaryRecords(path)
+        queries = {
+            "range (all)": lambda: vector_aggregate.range_totals(records, start, end + 1),
+            "range (last year)": lambda: vector_aggregate.range_totals(records, end - 365 * 86400, end + 1),
+            "by month": lambda: vector_aggregate.period_totals(records, start, end + 1, 'month'),
+            "by day": lambda: vector_aggregate.period_totals(records, start, end + 1, 'day'),
+        }
+        print(f"{args.records} records, {args.projects} projects, {os.path.getsize(path) / 2 ** 20:.1f} MiB")
+        print(f"{'query':<18} {'python ms':>10} {'numpy ms':>10} {'speedup':>8}")
+        too_slow = False
+        for name, query in queries.items():
+            vector_aggregate.np = None
+            python_s, expected = best_of(query, args.repeat)
+            vector_aggregate.np = numpy
+            numpy_s, result = best_of(query, args.repeat)
+            if result != expected:
+                sys.exit(f"{name}: numpy and pure-Python totals differ")
+            speedup = python_s / numpy_s
+            too_slow = too_slow or speedup < args.min_speedup
+            print(f"{name:<18} {python_s * 1000:>10.1f} {numpy_s * 1000:>10.1f} {speedup:>7.1f}x")
+        records.close()
+    finally:
+        vector_aggregate.np = numpy
+        for name in os.listdir(folder):
+            os.remove(os.path.join(folder, name))
+        os.rmdir(folder)
+    sys.exit(1 if too_slow else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Compact fixed-width binary form of records.txt, read through mmap.
+
+Layout (little endian):
+
+    header   8s magic 'TICOREC1', uint32 project count, uint32 flags
+    table    project count x 36-byte project ids (UUID text, space padded)
+    records  n x (uint32 project index, int64 end timestamp in microseconds, int32 seconds)
+
+The record count is implied by the file size. While FLAG_SORTED is set the
+records are in timestamp order and time-range reads are a binary search plus a
+zero-copy slice of the mapping.
+
+    python binary_records.py import records.txt records.bin
+    python binary_records.py export records.bin records.txt
+"""
+import mmap
+import os
+import struct
+import sys
+
+import streams
+from record_store import RecordStore
+
+MAGIC = b'TICOREC1'
+HEADER = struct.Struct('<8sII')
+ID_WIDTH = 36
+RECORD = struct.Struct('<Iqi')
+FLAG_SORTED = 1
+
+
+def to_micros(timestamp):
+    return round(timestamp * 1_000_000)
+
+
+def from_micros(micros):
+    # Exact for the 6-decimal timestamps records.txt holds: int / 1e6 rounds to the same double
+    return micros / 1_000_000
+
+
+class BinaryRecords:
+    """Read and append access to one binary records file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._open()
+
+    @classmethod
+    def create(cls, path, records):
+        """Write records [(project_id, timestamp, seconds)] sorted by timestamp and open the file"""
+        records = sorted(records, key=lambda r: r[1])
+        project_ids = list(dict.fromkeys(project_id for project_id, _, _ in records))
+        _write_file(path, project_ids, records, FLAG_SORTED)
+        return cls(path)
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            magic, count, self.flags = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a binary records file")
+            table = f.read(count * ID_WIDTH)
+        self.project_ids = [table[i:i + ID_WIDTH].decode('ascii').rstrip() for i in range(0, len(table), ID_WIDTH)]
+        self._project_index = {pid: i for i, pid in enumerate(self.project_ids)}
+        self.data_offset = HEADER.size + count * ID_WIDTH
+
+        self.close()
+        self._file = open(self.path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        if self._map is None:
+            return 0
+        return (len(self._map) - self.data_offset) // RECORD.size
+
+    @property
+    def is_sorted(self):
+        return bool(self.flags & FLAG_SORTED)
+
+    def _timestamp_at(self, i):
+        return RECORD.unpack_from(self._map, self.data_offset + i * RECORD.size)[1]
+
+    def _bisect(self, micros):
+        # First record index whose timestamp is >= micros
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamp_at(mid) < micros:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def index_range(self, start=None, end=None):
+        """Record index range [lo, hi) for start <= timestamp < end (sorted files only, unless unbounded)"""
+        if start is None and end is None:
+            return 0, len(self)
+        if not self.is_sorted:
+            raise ValueError("time-range slicing needs a sorted file; re-import it")
+        lo = 0 if start is None else self._bisect(to_micros(start))
+        hi = len(self) if end is None else self._bisect(to_micros(end))
+        return lo, max(lo, hi)
+
+    def raw_range(self, start=None, end=None):
+        """Zero-copy memoryview over the packed records for start <= timestamp < end"""
+        lo, hi = self.index_range(start, end)
+        if self._map is None:
+            return memoryview(b'')
+        return memoryview(self._map)[self.data_offset + lo * RECORD.size:self.data_offset + hi * RECORD.size]
+
+    def iter_range(self, start=None, end=None):
+        """Yield (project_id, timestamp, seconds) for start <= timestamp < end"""
+        # Sorted files: a binary search finds the first record and in_range stops at the first past end
+        view = self.raw_range(start) if self.is_sorted else self.raw_range()
+        records = self._decode(view)
+        try:
+            yield from streams.in_range(records, start, end, ordered=self.is_sorted)
+        finally:
+            records.close()
+            view.release()
+
+    def _decode(self, view):
+        project_ids = self.project_ids
+        for index, micros, seconds in RECORD.iter_unpack(view):
+            yield project_ids[index], from_micros(micros), seconds
+
+    def __iter__(self):
+        return self.iter_range()
+
+    def append_many(self, records):
+        """Append records; a project id the table has not seen forces a one-off rewrite"""
+        records = list(records)
+        if not records:
+            return
+        if any(project_id not in self._project_index for project_id, _, _ in records):
+            existing = list(self)
+            flags = _sorted_flags(self.flags, existing[-1][1] if existing else None, records)
+            project_ids = list(dict.fromkeys(self.project_ids + [pid for pid, _, _ in records]))
+            self.close()
+            _write_file(self.path, project_ids, existing + records, flags)
+            self._open()
+            return
+
+        last = from_micros(self._timestamp_at(len(self) - 1)) if len(self) else None
+        flags = _sorted_flags(self.flags, last, records)
+        self.close()
+        with open(self.path, 'r+b') as f:
+            if flags != self.flags:
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, len(self.project_ids), flags))
+            f.seek(0, os.SEEK_END)
+            f.write(b''.join(RECORD.pack(self._project_index[pid], to_micros(ts), secs) for pid, ts, secs in records))
+            f.flush()
+            os.fsync(f.fileno())
+        self._open()
+
+
+def _sorted_flags(flags, last, records):
+    """flags without FLAG_SORTED unless records, following a file ending at timestamp last, keep time order"""
+    previous = last
+    for _, timestamp, _ in records:
+        if previous is not None and timestamp < previous:
+            return flags & ~FLAG_SORTED
+        previous = timestamp
+    return flags
+
+
+def _write_file(path, project_ids, records, flags):
+    index = {pid: i for i, pid in enumerate(project_ids)}
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(project_ids), flags))
+        for project_id in project_ids:
+            encoded = project_id.encode('ascii')
+            if len(encoded) > ID_WIDTH:
+                raise ValueError(f"project id {project_id!r} is longer than {ID_WIDTH} characters")
+            f.write(encoded.ljust(ID_WIDTH))
+        f.write(b''.join(RECORD.pack(index[pid], to_micros(ts), secs) for pid, ts, secs in records))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def import_text(text_path, binary_path):
+    """records.txt -> binary file, sorted by timestamp"""
+    return BinaryRecords.create(binary_path, RecordStore(text_path).iter_records())
+
+
+def export_text(binary_path, text_path):
+    """Binary file -> records.txt layout (project_id|timestamp|seconds)"""
+    records = BinaryRecords(binary_path)
+    try:
+        with open(text_path, 'w') as f:
+            for project_id, timestamp, seconds in records:
+                f.write(f"{project_id}|{timestamp}|{seconds}\n")
+    finally:
+        records.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ('import', 'export'):
+        print(__doc__)
+        sys.exit(2)
+    if sys.argv[1] == 'import':
+        import_text(sys.argv[2], sys.argv[3]).close()
+    else:
+        export_text(sys.argv[2], sys.argv[3])
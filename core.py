@@ -0,0 +1,165 @@
+"""GUI-free project, record and report logic shared by counter.py and report.py"""
+import math
+import os
+from datetime import datetime, timedelta
+
+import instrumentation
+import streams
+from streams import parse_time  # inverse of format_time, kept in streams so it needs no core import
+from atomic_file import write_atomic
+from project_registry import ProjectRegistry
+
+PROJECTS_FILE = "projects.txt"
+RECORDS_FILE = "records.txt"
+PERIODS = ('day', 'week', 'month', 'quarter', 'year')
+
+
+def format_time(seconds):
+    # Convert total seconds to hours, minutes, seconds
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    seconds = seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def sum_session_times(session_file):
+    """Sum times for each project from a session log or summary file"""
+    try:
+        with open(session_file, 'r') as f:
+            if instrumentation.enabled:
+                instrumentation.count('session_files.scanned')
+                instrumentation.count('session_files.bytes_read', os.fstat(f.fileno()).st_size)
+            # Streamed line by line; only the per-project totals are kept
+            return streams.sum_by(streams.parse_session_log(f), 1, 2)
+    except FileNotFoundError:
+        print(f"Session file {session_file} not found")
+        return {}
+
+
+def format_summary(project_times):
+    return ''.join(f"{project_name}: {format_time(project_times[project_name])}\n"
+                   for project_name in sorted(project_times.keys()))
+
+
+def write_summary(path, project_times):
+    write_atomic(path, format_summary(project_times))
+
+
+def name_totals(totals_by_id, projects):
+    """Re-key {project_id: seconds} by project name; deleted projects keep their id"""
+    totals = {}
+    for project_id, seconds in totals_by_id.items():
+        name = projects[project_id][0] if project_id in projects else project_id
+        totals[name] = totals.get(name, 0) + seconds
+    return totals
+
+
+def day_bounds(day):
+    """[start, end) local timestamps of day (YYYYMMDD)"""
+    start = datetime.strptime(day, '%Y%m%d')
+    return start.timestamp(), datetime.fromordinal(start.toordinal() + 1).timestamp()
+
+
+def month_bounds(month):
+    """[start, end) local timestamps of month (YYYYMM)"""
+    start = datetime.strptime(month, '%Y%m')
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start.timestamp(), end.timestamp()
+
+
+def parse_day(text):
+    """Local midnight of YYYYMMDD or YYYY-MM-DD"""
+    return datetime.strptime(text.strip().replace('-', ''), '%Y%m%d')
+
+
+def period_start(moment, by):
+    """Local midnight starting the day/week (Monday)/month/quarter/year that holds moment"""
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if by == 'day':
+        return day
+    if by == 'week':
+        return day - timedelta(days=day.weekday())
+    if by == 'month':
+        return day.replace(day=1)
+    if by == 'quarter':
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    if by == 'year':
+        return day.replace(month=1, day=1)
+    raise ValueError(f"unknown period {by!r}")
+
+
+def next_period(start, by):
+    if by == 'day':
+        return datetime.fromordinal(start.toordinal() + 1)
+    if by == 'week':
+        return datetime.fromordinal(start.toordinal() + 7)
+    months = {'month': 1, 'quarter': 3, 'year': 12}[by]
+    month = start.month - 1 + months
+    return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+
+
+def period_label(start, by):
+    if by == 'day':
+        return start.strftime('%Y%m%d')
+    if by == 'week':
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if by == 'month':
+        return start.strftime('%Y%m')
+    if by == 'quarter':
+        return f"{start.year}Q{(start.month - 1) // 3 + 1}"
+    return str(start.year)
+
+
+def period_bounds(by, moment=None):
+    """[start, end) local timestamps of the period holding moment (default now)"""
+    start = period_start(moment or datetime.now(), by)
+    return start.timestamp(), next_period(start, by).timestamp()
+
+
+def quarter_bounds(quarter):
+    """[start, end) local timestamps of quarter (YYYYQn)"""
+    year, _, q = quarter.upper().partition('Q')
+    if not (year.isdigit() and len(year) == 4 and q in ('1', '2', '3', '4')):
+        raise ValueError(f"not a quarter: {quarter!r}")
+    return period_bounds('quarter', datetime(int(year), int(q) * 3 - 2, 1))
+
+
+def split_periods(start, end, by):
+    """[(label, start, end)] covering [start, end), cut at day/week/month/quarter/year boundaries"""
+    if not (math.isfinite(start) and math.isfinite(end)):
+        raise ValueError("splitting by period needs a finite range")
+    periods = []
+    period = period_start(datetime.fromtimestamp(start), by)
+    while period.timestamp() < end:
+        following = next_period(period, by)
+        periods.append((period_label(period, by), max(start, period.timestamp()), min(end, following.timestamp())))
+        period = following
+    return periods
+
+
+def range_breakdown(range_totals, start, end, by=None):
+    """{project_id: seconds} for [start, end), or {period label: {project_id: seconds}} split by period.
+
+    range_totals(start, end) is any backend's range query, e.g. Storage.range_totals.
+    """
+    if by is None:
+        return range_totals(start, end)
+    return {label: range_totals(lo, hi) for label, lo, hi in split_periods(start, end, by)}
+
+
+def format_breakdown(breakdown):
+    """Summary text with one block per period of {label: {project name: seconds}}"""
+    return ''.join(f"== {label} ==\n{format_summary(totals)}\n" for label, totals in breakdown.items())
+
+
+def totals_by_project(records):
+    """Sum (project_id, timestamp, seconds) records into {project_id: seconds}"""
+    return streams.sum_by(records, 0, 2)
+
+
+def load_projects_or_empty(data_dir):
+    try:
+        return ProjectRegistry.load(os.path.join(data_dir, PROJECTS_FILE))
+    except FileNotFoundError:
+        return {}
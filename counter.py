@@ -1,35 +1,71 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import filedialog, messagebox, ttk
 from datetime import datetime, timedelta
 import json
 import os
 import calendar
+import functools
 import uuid
 
+import core
+import instrumentation
+from persistence import WriteBehind
+from project_registry import ProjectRegistry
+from switch_buffer import SwitchBuffer
+from day_clock import DayClock
+from storage import TextStorage
+from tick_scheduler import TickScheduler
+from widgets import VirtualList, sync_combobox
+
+# Type-ahead keeps the timer dropdown short even for huge catalogs
+DROPDOWN_LIMIT = 50
+
 class TimeTracker:
-    def __init__(self):
+    def __init__(self, storage=None):
         self.root = tk.Tk()
         self.root.title("Project Time Tracker")
         self.root.geometry("400x400")
-
-        # Initialize project management
-        self.projects_file = "projects.txt"
-        self.time_records_file = "records.txt"
-        self.project_data = {}  # Dict to store project data {id: (name, hotkey)}
+        self.ticker = TickScheduler(self.root)  # owns all periodic UI work
+
+        # Initialize project management; text files in the working folder unless told otherwise
+        self.storage = storage or TextStorage()
+        recovery_messages = self.storage.recover()  # before anything reads or rewrites the data
+        self.writer = WriteBehind(self.storage)  # all Stop-path I/O goes through here
+        self.switches = SwitchBuffer()  # sessions from a burst of switches are persisted once it pauses
+        self.project_data = ProjectRegistry()  # {id: (name, hotkey)} with name/hotkey indexes
         self.load_projects()
+        if recovery_messages:
+            messagebox.showwarning("Recovered after a crash", "\n".join(recovery_messages), parent=self.root)
         
-        # Set up key bindings for hotkeys
+        # Set up key bindings for hotkeys, Ctrl+S forces pending writes to disk, F12 shows instrumentation
         self.root.bind('<KeyPress>', self.handle_hotkey)
+        self.root.bind('<Control-s>', lambda e: self.sync())
+        self.root.bind('<F12>', lambda e: self.show_debug_window())
+        self.debug_window = None
+        self.profile_path = None  # --profile: dump instrumentation here on exit
+        instrumentation.register_source('tick_scheduler', self.ticker.stats)
+        instrumentation.register_source('write_behind', self.writer.stats)
+        instrumentation.register_source('switch_buffer', self.switches.stats)
+        self.clock = DayClock()  # today's in-memory state is dropped when it changes
+        instrumentation.register_source('day_clock', self.clock.stats)
         
-        # Create session log file with current date-time
+        # Names this run's sessions; the text backend files the entries under the day they are logged
         current_date = datetime.now().strftime('%Y%m%d')
         current_time = datetime.now().strftime('%H%M%S')
-        self.session_log = f"session_{current_date}_{current_time}.txt"
+        self.session_log = f"session_{current_date}_{current_time}"
         
         self.current_project = None
         self.start_time = None
         self.is_tracking = False
-        self.daily_records = self.load_records()
+        # Closed months and deleted projects' records go to the archive, so the next start reads less
+        self.storage.archive(self.project_data.keys())
+
+        self.ticker.register('midnight', self.roll_over_day)
+
+        # Pages and dialogs are built once, then refreshed in place
+        self.timer_frame = None
+        self.modify_dialog = None
+        self.range_dialog = None
 
         # Create main frame for pages
         self.main_frame = tk.Frame(self.root)
@@ -38,34 +74,44 @@ class TimeTracker:
         # Create preview page
         self.create_preview_page()
 
+    @instrumentation.timed('ui.hotkey')
     def handle_hotkey(self, event):
-        # Only handle number keys 1-9
-        if not event.char.isdigit() or event.char == '0':
+        # Only handle number keys 1-9, and not while typing into a search box.
+        # ttk.Combobox subclasses tk.Entry and keeps focus after a project is picked, so it must not count.
+        typing = isinstance(event.widget, tk.Entry) and not isinstance(event.widget, ttk.Combobox)
+        if not event.char.isdigit() or event.char == '0' or typing:
             return
             
         # Find project with this hotkey
-        for pid, (name, hotkey) in self.project_data.items():
-            if hotkey == event.char:
-                if self.is_tracking:
-                    # Stop current tracking
-                    self.stop_timer()
-                    
-                # Switch to timer page if not already there
-                if hasattr(self, 'preview_frame') and self.preview_frame.winfo_viewable():
-                    self.show_timer_page()
-                    
-                # Select the project and start timer
-                self.project_var.set(name)
-                self.start_timer()
-                break
+        pid = self.project_data.id_by_hotkey(event.char)
+        if pid is None:
+            return
+
+        if self.is_tracking:
+            # Stop current tracking
+            self.stop_timer()
+            
+        # Switch to timer page if not already there
+        if hasattr(self, 'preview_frame') and self.preview_frame.winfo_viewable():
+            self.show_timer_page()
+            
+        # Select the project and start timer
+        self.project_var.set(self.project_data.name(pid))
+        self.start_timer()
 
     def create_preview_page(self):
         self.preview_frame = tk.Frame(self.main_frame)
         self.preview_frame.pack(fill=tk.BOTH, expand=True)
 
-        # Project list
-        self.project_listbox = tk.Listbox(self.preview_frame, selectmode=tk.MULTIPLE)
-        self.project_listbox.pack(pady=10, padx=20, fill=tk.BOTH, expand=True)
+        # Type-ahead search over project names
+        self.preview_search = tk.StringVar()
+        search_entry = tk.Entry(self.preview_frame, textvariable=self.preview_search)
+        search_entry.pack(pady=(10, 0), padx=20, fill=tk.X)
+        search_entry.bind('<KeyRelease>', lambda e: self.update_project_list())
+
+        # Project list, only the visible rows are rendered
+        self.project_view = VirtualList(self.preview_frame, self.project_row)
+        self.project_view.pack(pady=10, padx=20, fill=tk.BOTH, expand=True)
         self.update_project_list()
 
         # Buttons frame
@@ -80,15 +126,36 @@ class TimeTracker:
         start_button = tk.Button(button_frame, text="Start Timer", command=self.show_timer_page)
         start_button.pack(side=tk.LEFT, padx=5)
 
+    def project_row(self, project_id):
+        name, hotkey = self.project_data[project_id]
+        return f"({hotkey}){name}"
+
     def update_project_list(self):
-        self.project_listbox.delete(0, tk.END)
-        for name, hotkey in self.project_data.values():
-            self.project_listbox.insert(tk.END, f"({hotkey}){name}")
+        # Re-run each view's prefix search; the lists only render their visible window
+        self.project_view.set_source(self.project_data.search(self.preview_search.get()))
+        if self.modify_dialog is not None:
+            self.modify_view.set_source(self.project_data.search(self.modify_search.get()))
+        if self.timer_frame is not None:
+            self.filter_dropdown()
+
+    def filter_dropdown(self, event=None):
+        # Typing narrows the dropdown to matching names; otherwise show the first few
+        prefix = self.project_var.get() if event is not None else ''
+        matches = self.project_data.search(prefix)[:DROPDOWN_LIMIT]
+        sync_combobox(self.project_dropdown, [self.project_data.name(pid) for pid in matches])
 
     def show_modify_dialog(self):
-        dialog = tk.Toplevel(self.root)
+        if self.modify_dialog is not None:
+            self.update_project_list()
+            self.modify_dialog.deiconify()
+            self.modify_dialog.lift()
+            return
+
+        dialog = self.modify_dialog = tk.Toplevel(self.root)
         dialog.title("Modify Projects")
         dialog.geometry("300x400")
+        # Closing only hides the dialog so the next open reuses it
+        dialog.protocol("WM_DELETE_WINDOW", dialog.withdraw)
 
         # Project entry frame with name and hotkey
         entry_frame = tk.Frame(dialog)
@@ -98,42 +165,41 @@ class TimeTracker:
         name_frame = tk.Frame(entry_frame)
         name_frame.pack(fill=tk.X)
         tk.Label(name_frame, text="Project Name:").pack(side=tk.LEFT)
-        project_entry = tk.Entry(name_frame)
-        project_entry.pack(side=tk.LEFT, padx=5)
+        self.project_entry = tk.Entry(name_frame)
+        self.project_entry.pack(side=tk.LEFT, padx=5)
         
         # Hotkey entry
         hotkey_frame = tk.Frame(entry_frame)
         hotkey_frame.pack(fill=tk.X, pady=5)
         tk.Label(hotkey_frame, text="Hotkey (1-9):").pack(side=tk.LEFT)
-        hotkey_entry = tk.Entry(hotkey_frame, width=5)
-        hotkey_entry.pack(side=tk.LEFT, padx=5)
+        self.hotkey_entry = tk.Entry(hotkey_frame, width=5)
+        self.hotkey_entry.pack(side=tk.LEFT, padx=5)
 
         # Add button with both name and hotkey
         tk.Button(entry_frame, text="Add Project", 
-                 command=lambda: self.add_project(project_entry.get(), hotkey_entry.get(), dialog)).pack(pady=5)
+                 command=lambda: self.add_project(self.project_entry.get(), self.hotkey_entry.get())).pack(pady=5)
 
         # Project list frame
         list_frame = tk.Frame(dialog)
         list_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+
+        # Type-ahead search over project names
+        self.modify_search = tk.StringVar()
+        search_entry = tk.Entry(list_frame, textvariable=self.modify_search)
+        search_entry.pack(fill=tk.X)
+        search_entry.bind('<KeyRelease>', lambda e: self.update_project_list())
         
-        # Project list with scrollbar
-        scrollbar = tk.Scrollbar(list_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        project_list = tk.Listbox(list_frame, selectmode=tk.MULTIPLE, yscrollcommand=scrollbar.set)
-        project_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        scrollbar.config(command=project_list.yview)
-        
-        # Fill project list
-        for name, hotkey in self.project_data.values():
-            project_list.insert(tk.END, f"({hotkey}){name}")
+        # Project list with scrollbar, only the visible rows are rendered
+        self.modify_view = VirtualList(list_frame, self.project_row)
+        self.modify_view.pack(fill=tk.BOTH, expand=True)
 
         # Delete button
         tk.Button(list_frame, text="Delete Selected", 
-                 command=lambda: self.delete_project(project_list.curselection(), project_list, dialog)).pack(pady=5)
+                 command=lambda: self.delete_project(self.modify_view.selected_keys())).pack(pady=5)
 
-    def add_project(self, project_name, hotkey, dialog):
+        self.update_project_list()
+
+    def add_project(self, project_name, hotkey):
         if not project_name:
             return
         
@@ -141,140 +207,65 @@ class TimeTracker:
         if not hotkey or not hotkey.isdigit() or int(hotkey) < 1 or int(hotkey) > 9:
             return
             
-        # Check if hotkey is already used
-        for pid, (name, existing_hotkey) in self.project_data.items():
-            if existing_hotkey == hotkey:
-                return
-            if name == project_name:
-                return
+        # Reject names and hotkeys that are already used
+        if not self.project_data.add(str(uuid.uuid4()), project_name, hotkey):
+            return
         
-        project_id = str(uuid.uuid4())
-        self.project_data[project_id] = (project_name, hotkey)
         self.save_projects()
         self.update_project_list()
-        dialog.destroy()
-        self.show_modify_dialog()
+        self.project_entry.delete(0, tk.END)
+        self.hotkey_entry.delete(0, tk.END)
 
-    def delete_project(self, selections, project_list, dialog):
-        if selections:
-            # Get the selected project names
-            selected_texts = [project_list.get(idx) for idx in selections]
-            
-            # Find and delete the corresponding project IDs
-            for text in selected_texts:
-                # Extract name from "(hotkey)name" format
-                name = text[3:] if text.startswith('(') else text
-                project_id = self.get_project_id_by_name(name)
+    def delete_project(self, project_ids):
+        if project_ids:
+            for project_id in project_ids:
                 if project_id in self.project_data:
                     del self.project_data[project_id]
             
             self.save_projects()
+            # Neither list may keep ids of deleted projects selected
+            self.modify_view.clear_selection()
+            self.project_view.clear_selection()
             self.update_project_list()
-            dialog.destroy()
-            self.show_modify_dialog()
 
     def load_projects(self):
         try:
-            if os.path.exists(self.projects_file):
-                with open(self.projects_file, 'r') as f:
-                    projects_data = [line.strip().split('|') for line in f.readlines()]
-                    self.project_data = {}
-                    for parts in projects_data:
-                        if len(parts) == 3:  # id|name|hotkey format
-                            pid, name, hotkey = parts
-                            self.project_data[pid] = (name, hotkey)
-                    if not self.project_data:
-                        self.initialize_default_projects()
-            else:
+            self.project_data = self.storage.load_projects()
+            if not self.project_data:
                 self.initialize_default_projects()
         except (FileNotFoundError, ValueError):
             self.initialize_default_projects()
 
     def initialize_default_projects(self):
         default_projects = [("Project 1", "1"), ("Project 2", "2"), ("Project 3", "3")]
-        self.project_data = {str(uuid.uuid4()): data for data in default_projects}
+        self.project_data = ProjectRegistry({str(uuid.uuid4()): data for data in default_projects})
         self.save_projects()
 
     def save_projects(self):
-        with open(self.projects_file, 'w') as f:
-            for project_id, (name, hotkey) in self.project_data.items():
-                f.write(f"{project_id}|{name}|{hotkey}\n")
+        self.storage.save_projects(self.project_data)
 
     def get_project_id_by_name(self, project_name):
-        for pid, (name, _) in self.project_data.items():
-            if name == project_name:
-                return pid
-        return None
+        return self.project_data.id_by_name(project_name)
 
     def get_project_name_by_id(self, project_id):
-        if project_id in self.project_data:
-            return self.project_data[project_id][0]
-        return None
+        return self.project_data.name(project_id)
 
     def show_preview_page(self):
         self.timer_frame.pack_forget()
         self.preview_frame.pack(fill=tk.BOTH, expand=True)
 
-    def load_records(self):
-        try:
-            if os.path.exists(self.time_records_file):
-                records = {}
-                with open(self.time_records_file, 'r') as f:
-                    for line in f:
-                        parts = line.strip().split('|')
-                        if len(parts) == 3:  # project_id|timestamp|seconds
-                            project_id, timestamp, seconds = parts
-                            if project_id not in records:
-                                records[project_id] = []
-                            records[project_id].append(float(timestamp))
-                            records[project_id].append(int(seconds))
-                
-                # Filter for today's records only
-                today_records = {pid: [] for pid in self.project_data.keys()}
-                today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
-                today_end = datetime.now().replace(hour=23, minute=59, second=59, microsecond=999999).timestamp()
-                
-                for project_id, times in records.items():
-                    if project_id in self.project_data:
-                        for i in range(0, len(times), 2):
-                            if i + 1 < len(times):
-                                timestamp = times[i]
-                                if today_start <= timestamp <= today_end:
-                                    today_records[project_id].append(times[i])
-                                    today_records[project_id].append(times[i + 1])
-                
-                return today_records
-        except (FileNotFoundError, ValueError):
-            pass
-        
-        return {pid: [] for pid in self.project_data.keys()}
-
-    def save_records(self):
-        # Read existing records that aren't from today
-        existing_records = []
-        if os.path.exists(self.time_records_file):
-            today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
-            with open(self.time_records_file, 'r') as f:
-                for line in f:
-                    parts = line.strip().split('|')
-                    if len(parts) == 3:
-                        _, timestamp, _ = parts
-                        if float(timestamp) < today_start:
-                            existing_records.append(line.strip())
-
-        # Write back old records and append today's records
-        with open(self.time_records_file, 'w') as f:
-            # Write old records
-            for record in existing_records:
-                f.write(record + '\n')
-            
-            # Write today's records
-            for project_id, times in self.daily_records.items():
-                for i in range(0, len(times), 2):
-                    if i + 1 < len(times):
-                        timestamp = times[i]
-                        seconds = times[i + 1]
-                        f.write(f"{project_id}|{timestamp}|{seconds}\n")
+    def save_record(self, project_id, timestamp, seconds):
+        # Append-only: one line per finished session, written and fsynced by the writer thread
+        self.writer.append_record(project_id, timestamp, seconds)
+
+    def sync(self):
+        # Block until every finished session, including ones still held by the switch buffer, is on disk
+        self.commit_switches(force=True)
+        if self.writer.sync():
+            return True
+        messagebox.showwarning("Not saved", "Some sessions could not be written to disk. They are kept "
+                               "and saved again with the next write; see the console for the error.", parent=self.root)
+        return False
 
     def start_timer(self):
         project_name = self.project_var.get()
@@ -283,48 +274,23 @@ class TimeTracker:
             self.current_project = project_id
             self.start_time = datetime.now()
             self.is_tracking = True
+            self.shown_seconds = None
+            self.ticker.wake()
             self.start_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.NORMAL)
             self.project_dropdown.config(state=tk.DISABLED)
 
+    @instrumentation.timed('ui.stop_timer')
     def stop_timer(self):
         if self.is_tracking:
             duration = datetime.now() - self.start_time
             total_seconds = int(duration.total_seconds())
             current_time = datetime.now().timestamp()
-            
-            # Store timestamp and seconds using project ID
-            if self.current_project not in self.daily_records:
-                self.daily_records[self.current_project] = []
-            self.daily_records[self.current_project].append(current_time)
-            self.daily_records[self.current_project].append(total_seconds)
-            self.save_records()
-            
-            # Save to session log file with project name and time
-            project_name = self.get_project_name_by_id(self.current_project)
-            with open(self.session_log, 'a') as f:
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                f.write(f"{timestamp} - {project_name}: {self.format_time(total_seconds)}\n")
-            
-            # Generate updated daily summary
-            session_date = datetime.now().strftime('%Y%m%d')
-            all_sessions_today = [f for f in os.listdir() if f.startswith(f'session_{session_date}')] # check later if this is working
-            
-            # Combine all sessions for today
-            combined_times = {}
-            for session_file in all_sessions_today:
-                times = self.sum_session_times(session_file, generate_file=False)
-                for project, seconds in times.items():
-                    if project not in combined_times:
-                        combined_times[project] = 0
-                    combined_times[project] += seconds
-            
-            # Write daily summary
-            with open(f"Daily_Summary_{session_date}.txt", 'w') as f: #Here is create the daily summary file
-                for project_name in sorted(combined_times.keys()):
-                    total_seconds = combined_times[project_name]
-                    f.write(f"{project_name}: {self.format_time(total_seconds)}\n")
-            
+
+            # Only noted here; commit_switches persists it once switching pauses
+            self.switches.add(self.current_project, current_time, total_seconds)
+            self.ticker.register('commit', self.commit_switches)
+
             self.is_tracking = False
             self.start_time = None
             self.start_button.config(state=tk.NORMAL)
@@ -332,41 +298,88 @@ class TimeTracker:
             self.project_dropdown.config(state=tk.NORMAL)
             self.timer_label.config(text="00:00:00")
 
+    @instrumentation.timed('ui.commit_switches')
+    def commit_switches(self, force=False):
+        # Tick job: hand the sessions of the last burst of switches to the writer once it pauses
+        due = self.switches.due_in()
+        if due is None:
+            return None
+        if due > 0 and not force:
+            return max(1, int(due * 1000))
+
+        previous = self.clock.check()
+        if previous is not None:
+            # The midnight tick has not run yet (a late tick, or the machine slept through midnight)
+            self.start_new_day(previous)
+
+        sessions = [(project_id, timestamp, seconds, self.get_project_name_by_id(project_id))
+                    for project_id, timestamp, seconds in self.switches.take()]
+        # Records first: they are what reports count, and the buffer no longer holds these sessions
+        for project_id, timestamp, seconds, _ in sessions:
+            self.save_record(project_id, timestamp, seconds)
+        for _, timestamp, seconds, project_name in sessions:
+            logged_at = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            self.writer.log_session(self.session_log, logged_at, project_name, seconds)
+        # Each session counts toward the day it ended, even when committed after midnight.
+        # The summary is built from the shared session log, so other instances' sessions count too.
+        for day in sorted({datetime.fromtimestamp(timestamp).strftime('%Y%m%d') for _, timestamp, _, _ in sessions}):
+            self.writer.write_summary(f"Daily_Summary_{day}", functools.partial(self.daily_summary, day))
+        return None
+
+    def roll_over_day(self):
+        # Tick job: once the date changes, start the new day and commit what the old one still buffers
+        previous = self.clock.check()
+        if previous is not None:
+            self.start_new_day(previous)
+            self.commit_switches(force=True)
+        return self.clock.ms_to_midnight()
+
+    @instrumentation.timed('ui.start_new_day')
+    def start_new_day(self, previous):
+        if previous[:6] != self.clock.day[:6]:
+            # A month closed while running: archive it now instead of at the next start
+            self.storage.archive(self.project_data.keys())
+
+    @instrumentation.timed('writer.daily_summary')
+    def daily_summary(self, day):
+        # Runs on the writer thread; the session cache only rereads segments that changed
+        return core.format_summary(self.storage.session_totals(day))
+
     def update_timer(self):
-        if self.is_tracking and self.start_time:
-            duration = datetime.now() - self.start_time
-            total_seconds = int(duration.total_seconds())
+        # Tick job: touch the label only when the displayed second changes, idle when not tracking
+        if not (self.is_tracking and self.start_time):
+            return None
+        elapsed = (datetime.now() - self.start_time).total_seconds()
+        total_seconds = int(elapsed)
+        if total_seconds != self.shown_seconds:
+            self.shown_seconds = total_seconds
             self.timer_label.config(text=self.format_time(total_seconds))
-        self.root.after(1000, self.update_timer)
+        # Wake again just after the next second boundary
+        return int((total_seconds + 1 - elapsed) * 1000) + 1
 
     def format_time(self, seconds):
-        # Convert total seconds to hours, minutes, seconds
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        seconds = seconds % 60
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        return core.format_time(seconds)
 
     def show_timer_page(self):
         # Hide preview frame
         self.preview_frame.pack_forget()
         
-        # Create and show timer frame
-        self.create_timer_page()
+        # Build the timer frame on first use, afterwards just refresh and show it
+        if self.timer_frame is None:
+            self.create_timer_page()
+        else:
+            self.filter_dropdown()
+        self.timer_frame.pack(fill=tk.BOTH, expand=True)
 
     def create_timer_page(self):
         self.timer_frame = tk.Frame(self.main_frame)
-        self.timer_frame.pack(fill=tk.BOTH, expand=True)
-
-        # Create new session log file when timer page is created
-        current_date = datetime.now().strftime('%Y%m%d')
-        current_time = datetime.now().strftime('%H%M%S')
-        self.session_log = f"session_{current_date}_{current_time}.txt"
 
         # Project selection
         self.project_var = tk.StringVar()
-        project_names = [name for name, _ in self.project_data.values()]
-        self.project_dropdown = ttk.Combobox(self.timer_frame, textvariable=self.project_var, values=project_names)
+        self.project_dropdown = ttk.Combobox(self.timer_frame, textvariable=self.project_var)
+        self.filter_dropdown()
         self.project_dropdown.set("Select Project")
+        self.project_dropdown.bind('<KeyRelease>', self.filter_dropdown)
         self.project_dropdown.pack(pady=20)
 
         # Timer display
@@ -395,93 +408,184 @@ class TimeTracker:
         self.summary_button = tk.Button(bottom_frame, text="Month Report", command=self.generate_report, width=12)
         self.summary_button.pack(side=tk.LEFT, padx=5)
 
-
-        self.report_button = tk.Button(bottom_frame, text="Month Report", command=self.generate_report, width=12)
-        self.report_button.pack(side=tk.LEFT, padx=5)
+        self.range_button = tk.Button(bottom_frame, text="Range Report", command=self.show_range_dialog, width=12)
+        self.range_button.pack(side=tk.LEFT, padx=5)
         
         self.back_button = tk.Button(bottom_frame, text="Back to Projects", command=self.show_preview_page, width=12)
         self.back_button.pack(side=tk.LEFT, padx=5)
 
-        # Initialize timer variables
-        self.current_project = None
-        self.start_time = None
-        self.is_tracking = False
-        self.daily_records = self.load_records()
-        
-        self.update_timer()
+        self.ticker.register('timer', self.update_timer)
 
-    def generate_report(self):
+    @instrumentation.timed('ui.generate_report')
+    def generate_report(self, month=None):
         if self.is_tracking:          # stop current timer first
             self.stop_timer()
 
-        current_month = datetime.now().strftime('%Y%m')
-        monthly_times = {}
-
-        # pick all daily files whose *date* (the third chunk) starts with YYYYMM
-        for fname in (f for f in os.listdir()
-                    if f.startswith('Daily_Summary_')
-                    and f.split('_')[-1][:6] == current_month):
-            for project, secs in self.sum_session_times(fname, generate_file=False).items():
-                monthly_times[project] = monthly_times.get(project, 0) + secs
-
-        with open(f"Montly_Summary_{current_month}.txt", 'w') as f:
-            for project in sorted(monthly_times):
-                f.write(f"{project}: {self.format_time(monthly_times[project])}\n")
+        # Month totals come from the records rollup: exact seconds, no directory scan.
+        # The rollup is updated by the writer thread, so let queued records land first.
+        self.sync()
+        report_month = month or datetime.now().strftime('%Y%m')
+        monthly_times = core.name_totals(self.storage.month_totals(report_month), self.project_data)
+        self.writer.write_summary(f"Montly_Summary_{report_month}", core.format_summary(monthly_times))
+
+    def show_range_dialog(self):
+        # Any range of days, optionally split by period or narrowed to one project; built once, then reused
+        if self.range_dialog is not None:
+            self.range_dialog.deiconify()
+            self.range_dialog.lift()
+            return
 
+        dialog = self.range_dialog = tk.Toplevel(self.root)
+        dialog.title("Range Report")
+        dialog.protocol("WM_DELETE_WINDOW", dialog.withdraw)
+
+        form = tk.Frame(dialog)
+        form.pack(pady=10, padx=10, fill=tk.X)
+        tk.Label(form, text="From (YYYY-MM-DD):").grid(row=0, column=0, sticky=tk.W)
+        self.range_from = tk.Entry(form, width=12)
+        self.range_from.grid(row=0, column=1, sticky=tk.W, padx=5)
+        tk.Label(form, text="To (inclusive):").grid(row=1, column=0, sticky=tk.W)
+        self.range_to = tk.Entry(form, width=12)
+        self.range_to.grid(row=1, column=1, sticky=tk.W, padx=5)
+        tk.Label(form, text="Split by:").grid(row=2, column=0, sticky=tk.W)
+        self.range_by = ttk.Combobox(form, values=['none', *core.PERIODS], state='readonly', width=10)
+        self.range_by.set('none')
+        self.range_by.grid(row=2, column=1, sticky=tk.W, padx=5)
+        tk.Label(form, text="Project (blank = all):").grid(row=3, column=0, sticky=tk.W)
+        self.range_project = tk.Entry(form)
+        self.range_project.grid(row=3, column=1, sticky=tk.W, padx=5)
+
+        presets = tk.Frame(dialog)
+        presets.pack(padx=10, fill=tk.X)
+        for label, period in [("This Week", 'week'), ("This Month", 'month'),
+                              ("This Quarter", 'quarter'), ("This Year", 'year')]:
+            tk.Button(presets, text=label, command=lambda p=period: self.set_range_preset(p)).pack(side=tk.LEFT, padx=2)
+
+        self.range_output = tk.Text(dialog, width=50, height=16)
+        self.range_output.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+
+        buttons = tk.Frame(dialog)
+        buttons.pack(pady=(0, 10))
+        tk.Button(buttons, text="Run", command=self.run_range_report, width=10).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons, text="Save", command=self.save_range_report, width=10).pack(side=tk.LEFT, padx=5)
+
+        self.range_result = None  # (summary name, text) of the last run
+        self.set_range_preset('week')
+
+    def set_range_preset(self, period):
+        start, end = core.period_bounds(period)
+        last_day = datetime.fromtimestamp(end) - timedelta(days=1)
+        for entry, day in ((self.range_from, datetime.fromtimestamp(start)), (self.range_to, last_day)):
+            entry.delete(0, tk.END)
+            entry.insert(0, day.strftime('%Y-%m-%d'))
+        self.run_range_report()
+
+    @instrumentation.timed('ui.range_report')
+    def run_range_report(self):
+        self.range_output.delete('1.0', tk.END)
+        try:
+            first, last = core.parse_day(self.range_from.get()), core.parse_day(self.range_to.get())
+        except ValueError:
+            self.range_output.insert('1.0', "Dates must be YYYY-MM-DD")
+            return
+        by = None if self.range_by.get() == 'none' else self.range_by.get()
+        project = self.range_project.get().strip()
+
+        # Records are written by the writer thread; let queued ones land before querying
+        self.sync()
+        start, end = first.timestamp(), core.period_bounds('day', last)[1]
+        breakdown = core.range_breakdown(self.storage.range_totals, start, end, by)
+
+        def named(totals_by_id):
+            totals = core.name_totals(totals_by_id, self.project_data)
+            return {name: seconds for name, seconds in totals.items() if not project or name == project}
+
+        if by is None:
+            text = core.format_summary(named(breakdown))
+        else:
+            text = core.format_breakdown({label: named(totals) for label, totals in breakdown.items()})
+        name = f"Range_Summary_{first.strftime('%Y%m%d')}_{last.strftime('%Y%m%d')}"
+        self.range_result = (name, text)
+        self.range_output.insert('1.0', text or "No time recorded in this range")
+
+    def save_range_report(self):
+        if self.range_result is not None:
+            self.writer.write_summary(*self.range_result)
 
     def sum_session_times(self, session_file, generate_file=True):
         """Sum times for each project from a session log file"""
-        project_times = {}  # Dictionary to store total seconds per project
-        
-        try:
-            with open(session_file, 'r') as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    
-                    # Split the line into timestamp, project and time
-                    if " - " in line:
-                        _, rest = line.strip().split(" - ", 1)
-                    else:
-                        rest = line.strip()
-                    
-                    parts = rest.split(': ')
-                    if len(parts) != 2:
-                        continue
-                    
-                    project_name = parts[0]
-                    if '(' in project_name:  # Handle "(hotkey)name" format
-                        project_name = project_name[3:]  # Remove "(n)" prefix
-                    time_str = parts[1]
-                    
-                    try:
-                        h, m, s = map(int, time_str.split(':'))
-                        seconds = h * 3600 + m * 60 + s
-                        if project_name not in project_times:
-                            project_times[project_name] = 0
-                        project_times[project_name] += seconds
-                    except ValueError:
-                        continue
-            
-            if generate_file:
-                # Generate daily summary report (overwrite if exists)
-                session_date = session_file.split('_')[1]  # Extract date from filename
-                summary_file = f"Daily_Summary_{session_date}.txt"
-                
-                with open(summary_file, 'w') as f:
-                    for project_name in sorted(project_times.keys()):
-                        total_seconds = project_times[project_name]
-                        f.write(f"{project_name}: {self.format_time(total_seconds)}\n")
-            
-            return project_times
-                    
-        except FileNotFoundError:
-            print(f"Session file {session_file} not found")
-            return {}
+        project_times = core.sum_session_times(session_file)
+        if generate_file and os.path.exists(session_file):
+            # Generate daily summary report (overwrite if exists)
+            session_date = os.path.basename(session_file)[8:16]  # session_YYYYMMDD[_HHMMSS].txt
+            core.write_summary(f"Daily_Summary_{session_date}.txt", project_times)
+        return project_times
+
+    def show_debug_window(self):
+        # Live instrumentation readout; opening it switches instrumentation on
+        instrumentation.enable()
+        if self.debug_window is None:
+            self.debug_window = tk.Toplevel(self.root)
+            self.debug_window.title("Instrumentation")
+            self.debug_window.protocol("WM_DELETE_WINDOW", self.debug_window.withdraw)
+            self.debug_text = tk.Text(self.debug_window, width=80, height=32, font=("Courier", 9))
+            self.debug_text.pack(fill=tk.BOTH, expand=True)
+
+            buttons = tk.Frame(self.debug_window)
+            buttons.pack(fill=tk.X)
+            self.debug_toggle = tk.Button(buttons, text="Pause", command=self.toggle_instrumentation)
+            self.debug_toggle.pack(side=tk.LEFT, padx=5, pady=5)
+            tk.Button(buttons, text="Reset", command=instrumentation.reset).pack(side=tk.LEFT, padx=5, pady=5)
+            tk.Button(buttons, text="Save JSON...", command=self.save_instrumentation).pack(side=tk.LEFT, padx=5, pady=5)
+        else:
+            self.debug_window.deiconify()
+            self.debug_window.lift()
+        self.ticker.register('debug', self.refresh_debug_window)
+
+    def refresh_debug_window(self):
+        # Tick job: once a second while the window is shown, idle once it is closed
+        if self.debug_window is None or self.debug_window.state() == 'withdrawn':
+            return None
+        self.debug_toggle.config(text="Pause" if instrumentation.enabled else "Resume")
+        self.debug_text.delete('1.0', tk.END)
+        self.debug_text.insert('1.0', instrumentation.format_snapshot())
+        return 1000
+
+    def toggle_instrumentation(self):
+        if instrumentation.enabled:
+            instrumentation.disable()
+        else:
+            instrumentation.enable()
+        self.refresh_debug_window()
+
+    def save_instrumentation(self):
+        path = filedialog.asksaveasfilename(parent=self.debug_window, defaultextension='.json',
+                                            initialfile='tico_profile.json')
+        if path:
+            instrumentation.dump(path)
 
     def run(self):
         self.root.mainloop()
+        self.commit_switches(force=True)
+        self.writer.close()
+        self.storage.close()
+        if self.profile_path:
+            instrumentation.dump(self.profile_path)
 
 if __name__ == "__main__":
-    app = TimeTracker()
+    import argparse
+    parser = argparse.ArgumentParser(description="Project Time Tracker")
+    parser.add_argument('--db', metavar='FILE', help="keep all data in this SQLite database instead of text files")
+    parser.add_argument('--profile', metavar='FILE', nargs='?', const='tico_profile.json',
+                        help="record instrumentation from startup and write it as JSON on exit")
+    args = parser.parse_args()
+
+    if args.profile:
+        instrumentation.enable()
+    if args.db:
+        from sqlite_storage import SqliteStorage
+        app = TimeTracker(SqliteStorage(args.db))
+    else:
+        app = TimeTracker()
+    app.profile_path = args.profile
     app.run()
@@ -4,16 +4,27 @@ from datetime import datetime, timedelta
 import json
 import os
 
+from atomic_file import recover, write_atomic
+from project_registry import ProjectRegistry
+import session_log
+from session_store import SessionStore
+from tick_scheduler import TickScheduler
+from day_clock import DayClock
+
 class TimeTracker:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Project Time Tracker")
         self.root.geometry("400x400")
+        self.ticker = TickScheduler(self.root)  # owns all periodic UI work
+        self.clock = DayClock()  # daily_records is dropped when the date changes
 
         # Initialize project management
         self.projects_file = "projects.txt"
         self.time_records_file = "time_records.json"
-        self.project_data = {}  # Dict to store project data {id: name}
+        self.project_data = ProjectRegistry()  # {id: (name, hotkey)} with name/hotkey indexes
+        recover('.')  # drop temp files of saves interrupted by a crash
+        session_log.migrate('.')  # fold old per-run session files into the day logs
         self.load_projects()
         
         # Create main frame for pages
@@ -26,11 +37,9 @@ class TimeTracker:
     def load_projects(self):
         try:
             if os.path.exists(self.projects_file):
-                with open(self.projects_file, 'r') as f:
-                    projects_data = [line.strip().split('|') for line in f.readlines()]
-                    self.project_data = {pid: name for pid, name in projects_data if pid and name}
-                    if not self.project_data:
-                        self.initialize_default_projects()
+                self.project_data = ProjectRegistry.load(self.projects_file)
+                if not self.project_data:
+                    self.initialize_default_projects()
             else:
                 self.initialize_default_projects()
         except (FileNotFoundError, ValueError):
@@ -39,22 +48,17 @@ class TimeTracker:
     def initialize_default_projects(self):
         import uuid
         default_projects = ["Project 1", "Project 2", "Project 3"]
-        self.project_data = {str(uuid.uuid4()): name for name in default_projects}
+        self.project_data = ProjectRegistry({str(uuid.uuid4()): (name, '') for name in default_projects})
         self.save_projects()
 
     def save_projects(self):
-        with open(self.projects_file, 'w') as f:
-            for project_id, name in self.project_data.items():
-                f.write(f"{project_id}|{name}\n")
+        self.project_data.save(self.projects_file)
 
     def get_project_id_by_name(self, project_name):
-        for pid, name in self.project_data.items():
-            if name == project_name:
-                return pid
-        return None
+        return self.project_data.id_by_name(project_name)
 
     def get_project_name_by_id(self, project_id):
-        return self.project_data.get(project_id)
+        return self.project_data.name(project_id)
         
     def create_preview_page(self):
         self.preview_frame = tk.Frame(self.main_frame)
@@ -79,7 +83,7 @@ class TimeTracker:
 
     def update_project_list(self):
         self.project_listbox.delete(0, tk.END)
-        for name in self.project_data.values():
+        for name in self.project_data.names():
             self.project_listbox.insert(tk.END, name)
 
     def show_modify_dialog(self):
@@ -113,7 +117,7 @@ class TimeTracker:
         scrollbar.config(command=project_list.yview)
         
         # Fill project list
-        for project_name in self.project_data.values():
+        for project_name in self.project_data.names():
             project_list.insert(tk.END, project_name)
 
         # Delete button
@@ -121,10 +125,9 @@ class TimeTracker:
                  command=lambda: self.delete_project(project_list.curselection(), project_list, dialog)).pack(pady=5)
 
     def add_project(self, project_name, dialog):
-        if project_name and project_name not in self.project_data.values():
+        if project_name and self.project_data.is_free(project_name):
             import uuid
-            project_id = str(uuid.uuid4())
-            self.project_data[project_id] = project_name
+            self.project_data.add(str(uuid.uuid4()), project_name)
             self.save_projects()
             self.update_project_list()
             dialog.destroy()
@@ -157,13 +160,10 @@ class TimeTracker:
         self.timer_frame = tk.Frame(self.main_frame)
         self.timer_frame.pack(fill=tk.BOTH, expand=True)
 
-        # Create new session log file when timer page is created
-        self.session_log = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-
         # Project selection
         self.project_var = tk.StringVar()
         self.project_dropdown = ttk.Combobox(self.timer_frame, textvariable=self.project_var, 
-                                           values=list(self.project_data.values()))
+                                           values=self.project_data.names())
         self.project_dropdown.set("Select Project")
         self.project_dropdown.pack(pady=20)
 
@@ -199,7 +199,7 @@ class TimeTracker:
         self.is_tracking = False
         self.daily_records = self.load_records()
         
-        self.update_timer()
+        self.ticker.register('timer', self.update_timer)
 
     def show_preview_page(self):
         self.timer_frame.pack_forget()
@@ -211,34 +211,30 @@ class TimeTracker:
                 with open(self.time_records_file, 'r') as f:
                     all_records = json.load(f)
                 
-                # Create a new dictionary for today's records
-                today_records = {pid: [] for pid in self.project_data.keys()}
+                # Create a new store for today's records
+                today_records = SessionStore(self.project_data.keys())
                 today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
                 today_end = datetime.now().replace(hour=23, minute=59, second=59, microsecond=999999).timestamp()
                 
                 # Only copy times from today to the new records
-                for project_id, times in all_records.items():
+                for project_id, sessions in SessionStore.from_interleaved(all_records).items():
                     if project_id in self.project_data:  # Check by ID instead of name
-                        for i in range(0, len(times), 2):
-                            if i + 1 < len(times):
-                                timestamp = times[i]
-                                if today_start <= timestamp <= today_end:
-                                    today_records[project_id].append(times[i])
-                                    today_records[project_id].append(times[i + 1])
+                        lo, hi = sessions.span(today_start, today_end)
+                        for timestamp, seconds in zip(sessions.timestamps[lo:hi], sessions.seconds[lo:hi]):
+                            today_records.add(project_id, timestamp, seconds)
                 
                 return today_records
         except FileNotFoundError:
             pass
         
-        return {pid: [] for pid in self.project_data.keys()}
+        return SessionStore(self.project_data.keys())
 
     def is_from_today(self, timestamp):
         today = datetime.now().date()
         return datetime.fromtimestamp(timestamp).date() == today
 
     def save_records(self):
-        with open('time_records.json', 'w') as f:
-            json.dump(self.daily_records, f)
+        write_atomic('time_records.json', json.dumps(self.daily_records.to_interleaved()))
 
     def start_timer(self):
         project_name = self.project_var.get()
@@ -247,6 +243,8 @@ class TimeTracker:
             self.current_project = project_id
             self.start_time = datetime.now()
             self.is_tracking = True
+            self.shown_seconds = None
+            self.ticker.wake()
             self.start_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.NORMAL)
             self.project_dropdown.config(state=tk.DISABLED)
@@ -257,18 +255,19 @@ class TimeTracker:
             total_seconds = int(duration.total_seconds())
             current_time = datetime.now().timestamp()
             
+            if self.clock.check() is not None:
+                # Past midnight: start today's records empty, as a restart would
+                self.daily_records = SessionStore(self.project_data.keys())
+
             # Store timestamp and seconds using project ID
-            if self.current_project not in self.daily_records:
-                self.daily_records[self.current_project] = []
-            self.daily_records[self.current_project].append(current_time)
-            self.daily_records[self.current_project].append(total_seconds)
+            self.daily_records.add(self.current_project, current_time, total_seconds)
             self.save_records()
             
             # Save to session log file with project name
             project_name = self.get_project_name_by_id(self.current_project)
-            with open(self.session_log, 'a') as f:
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                f.write(f"{timestamp} - {project_name}: {self.format_time(total_seconds)}\n")
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            session_log.append('.', {session_log.entry_day(timestamp): [
+                session_log.format_entry(timestamp, project_name, total_seconds)]})
             
             self.is_tracking = False
             self.start_time = None
@@ -278,11 +277,16 @@ class TimeTracker:
             self.timer_label.config(text="00:00:00")
 
     def update_timer(self):
-        if self.is_tracking and self.start_time:
-            duration = datetime.now() - self.start_time
-            total_seconds = int(duration.total_seconds())
+        # Tick job: touch the label only when the displayed second changes, idle when not tracking
+        if not (self.is_tracking and self.start_time):
+            return None
+        elapsed = (datetime.now() - self.start_time).total_seconds()
+        total_seconds = int(elapsed)
+        if total_seconds != self.shown_seconds:
+            self.shown_seconds = total_seconds
             self.timer_label.config(text=self.format_time(total_seconds))
-        self.root.after(1000, self.update_timer)
+        # Wake again just after the next second boundary
+        return int((total_seconds + 1 - elapsed) * 1000) + 1
 
     def format_time(self, seconds):
         # Convert total seconds to hours, minutes, seconds
@@ -301,15 +305,11 @@ class TimeTracker:
             today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
             today_end = datetime.now().replace(hour=23, minute=59, second=59, microsecond=999999).timestamp()
             
-            for project_id, times in self.daily_records.items():
+            for project_id, total_seconds in self.daily_records.totals(today_start, today_end).items():
                 project_name = self.get_project_name_by_id(project_id)
                 if not project_name:
                     continue
                     
-                # Get durations for timestamps within today
-                today_times = [times[i+1] for i in range(0, len(times), 2) 
-                             if i+1 < len(times) and today_start <= times[i] <= today_end]
-                total_seconds = sum(today_times) if today_times else 0
                 f.write(f"{project_name}: {self.format_time(total_seconds)}\n")
 
     def run(self):
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import core
+
+
+class DayClock:
+    """The local day a long-running instance is working in.
+
+    check() notices the date change once, however late it is called (a tick that
+    fired late, a laptop that slept through midnight), so the caller can drop the
+    finished day's state and start the new day empty.
+    """
+
+    def __init__(self, now=datetime.now):
+        self.now = now  # the soak benchmark runs on a simulated clock
+        self.day = now().strftime('%Y%m%d')
+        self.start, self.end = core.day_bounds(self.day)
+        self.rollovers = 0
+
+    def check(self):
+        """The day (YYYYMMDD) that just ended if the date changed since the last check, else None"""
+        today = self.now().strftime('%Y%m%d')
+        if today == self.day:
+            return None
+        previous, self.day = self.day, today
+        self.start, self.end = core.day_bounds(today)
+        self.rollovers += 1
+        return previous
+
+    def ms_to_midnight(self):
+        # Timestamps, not naive datetimes, so a DST change on the day is accounted for
+        return max(1, int((self.end - self.now().timestamp()) * 1000) + 1)
+
+    def stats(self):
+        return {
+            "day": self.day,
+            "rollovers": self.rollovers,
+        }
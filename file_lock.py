@@ -0,0 +1,108 @@
+import errno
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Advisory lock shared by every process that opens the same lock file.
+
+    flock() on POSIX; msvcrt.locking() on Windows, which has no shared mode, so
+    readers lock exclusively there. Waiting is a short polling loop bounded by
+    timeout, after which TimeoutError is raised instead of hanging the caller.
+    Not thread-safe: callers serialize their own threads before taking it.
+
+    A reader in a folder it may not write to (reports over another user's data)
+    locks an existing lock file read-only, or, where it cannot, reads unlocked;
+    read_only tells the caller not to write anything back.
+    """
+
+    def __init__(self, path, timeout=10.0):
+        self.path = path
+        self.timeout = timeout
+        self._fd = None
+        self.read_only = False
+        self.acquisitions = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @contextmanager
+    def hold(self, shared=False):
+        self.acquire(shared)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, shared=False):
+        if self._fd is None and not self.read_only:
+            try:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+            except OSError as e:
+                if not (shared and e.errno in (errno.EACCES, errno.EPERM, errno.EROFS)):
+                    raise
+                self.read_only = True
+                self._fd = self._open_read_only()
+        elif self.read_only and not shared:
+            raise PermissionError(errno.EACCES, "cannot write-lock", self.path)
+        start = time.perf_counter()
+        delay = 0.0005
+        while self._fd is not None and not self._try_lock(shared):
+            if time.perf_counter() - start >= self.timeout:
+                raise TimeoutError(f"could not lock {self.path} within {self.timeout:.1f} s")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.002)
+        waited = time.perf_counter() - start
+        self.acquisitions += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def _open_read_only(self):
+        # flock() works on a read-only descriptor; msvcrt.locking() may not, so Windows reads unlocked
+        if fcntl is None:
+            return None
+        try:
+            return os.open(self.path, os.O_RDONLY)
+        except OSError:
+            return None
+
+    def _try_lock(self, shared):
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            try:
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+            except OSError:  # held by another process
+                return False
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def stats(self):
+        return {
+            "acquisitions": self.acquisitions,
+            "mean_wait_ms": self.wait_seconds * 1000 / self.acquisitions if self.acquisitions else 0.0,
+            "max_wait_ms": self.max_wait_seconds * 1000,
+        }
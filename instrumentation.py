@@ -0,0 +1,166 @@
+"""Opt-in timing spans, I/O counters and rolling latency histograms.
+
+Everything is off until enable() is called (counter.py --profile, or the debug
+window). While off, span() hands back one shared no-op context manager and
+count() returns after a single flag check, so the hooks can stay on hot paths.
+
+    @instrumentation.timed('ui.stop_timer')
+    def stop_timer(self): ...
+
+    with instrumentation.span('writer.flush'):
+        ...
+    instrumentation.count('records.bytes_written', len(data))
+"""
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import atomic_file
+
+WINDOW = 1000  # latest samples kept per span for the rolling histogram
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+enabled = False
+_lock = threading.Lock()
+_spans = {}  # name -> SpanStats
+_counters = {}  # name -> int
+_sources = {}  # name -> callable returning a dict, e.g. TickScheduler.stats
+_NULL_SPAN = nullcontext()
+
+
+class SpanStats:
+    __slots__ = ('count', 'total', 'max', 'recent')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=WINDOW)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def summary(self):
+        recent = sorted(self.recent)
+        histogram, i = {}, 0
+        for bound in BUCKETS_MS:
+            start = i
+            while i < len(recent) and recent[i] * 1000 <= bound:
+                i += 1
+            histogram[f"<={bound}ms"] = i - start
+        histogram[f">{BUCKETS_MS[-1]}ms"] = len(recent) - i
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "max_ms": self.max * 1000,
+            "recent_p50_ms": recent[len(recent) // 2] * 1000 if recent else 0.0,
+            "recent_p99_ms": recent[min(len(recent) - 1, int(len(recent) * 0.99))] * 1000 if recent else 0.0,
+            "histogram": histogram,
+        }
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            stats = _spans.get(self.name)
+            if stats is None:
+                stats = _spans[self.name] = SpanStats()
+            stats.add(elapsed)
+        return False
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def span(name):
+    """Context manager timing the block under name; free when disabled"""
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def timed(name):
+    """Decorator form of span(); checks the flag on every call, so it can be applied at import time"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def register_source(name, stats):
+    """Include stats() (a dict) in every snapshot, e.g. the tick scheduler or write-behind counters"""
+    _sources[name] = stats
+
+
+def snapshot():
+    with _lock:
+        data = {
+            "enabled": enabled,
+            "spans": {name: stats.summary() for name, stats in sorted(_spans.items())},
+            "counters": dict(sorted(_counters.items())),
+        }
+    data["sources"] = {name: stats() for name, stats in sorted(_sources.items())}
+    return data
+
+
+def dump(path):
+    """Write snapshot() as JSON"""
+    atomic_file.write_atomic(path, json.dumps(snapshot(), indent=2))
+
+
+def format_snapshot(data=None):
+    """Plain-text rendering of snapshot() for the debug window"""
+    data = data or snapshot()
+    lines = [f"instrumentation {'on' if data['enabled'] else 'off'}", "",
+             f"{'span':<28} {'count':>7} {'mean ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    for name, s in data["spans"].items():
+        lines.append(f"{name:<28} {s['count']:>7} {s['mean_ms']:>9.2f} {s['recent_p99_ms']:>9.2f} {s['max_ms']:>9.2f}")
+    lines += ["", "counters"]
+    lines += [f"  {name:<34} {value:>12}" for name, value in data["counters"].items()]
+    for source, stats in data["sources"].items():
+        lines += ["", source]
+        lines += [f"  {name:<34} {value:>12.2f}" if isinstance(value, float) else f"  {name:<34} {str(value):>12}"
+                  for name, value in stats.items()]
+    return "\n".join(lines)
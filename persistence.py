@@ -0,0 +1,163 @@
+import queue
+import sys
+import threading
+import time
+
+import instrumentation
+
+
+class WriteBehind:
+    """Background writer so the Tk thread only enqueues storage writes and returns.
+
+    Pending work is drained in batches and handed to the Storage backend: records
+    and session log entries go down as one batch each, and summaries with the same
+    name collapse to the newest one. The queue is bounded, so a stalled disk slows
+    the producer down instead of growing memory without limit. sync() waits until
+    everything enqueued before it is on disk. A write that fails is kept and tried
+    again with the next batch; sync() returns False until it has gone through.
+    """
+
+    def __init__(self, storage, max_pending=1000, batch_window=0.05):
+        self.storage = storage
+        self.batch_window = batch_window
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        # Work from failed flushes, retried with the next batch
+        self._failed_records, self._failed_sessions, self._failed_summaries = [], [], {}
+
+        self.batches = 0
+        self.items = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.last_flush_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def append_record(self, project_id, timestamp, seconds):
+        self._put(('record', (project_id, timestamp, seconds)))
+
+    def log_session(self, session, logged_at, project_name, seconds):
+        self._put(('session', (session, logged_at, project_name, seconds)))
+
+    def write_summary(self, name, content):
+        """Replace summary name with content; only the newest pending content per name is written.
+
+        content may be a callable, called on the writer thread once the session log
+        entries enqueued before it are on disk.
+        """
+        self._put(('summary', name, content))
+
+    @instrumentation.timed('writer.sync_wait')
+    def sync(self, timeout=None):
+        """Block until everything enqueued so far is durable; returns False on timeout or if writing failed"""
+        done = threading.Event()
+        result = []
+        self._put(('sync', done, result))
+        return done.wait(timeout) and result == [True]
+
+    def close(self):
+        """Flush everything and stop the worker"""
+        if self._closed:
+            return
+        self.sync()
+        self._closed = True
+        self._queue.put(('stop',))
+        self._thread.join()
+        lost = len(self._failed_records) + len(self._failed_sessions) + len(self._failed_summaries)
+        if lost:
+            print(f"Write-behind closed with {lost} writes that could not be saved", file=sys.stderr)
+
+    def _put(self, item):
+        if self._closed:
+            raise RuntimeError("write-behind queue is closed")
+        self._queue.put(item)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Give a burst (e.g. rapid hotkey switching) a moment to pile up, then take it all
+            if self.batch_window:
+                time.sleep(self.batch_window)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not self._flush(batch):
+                return
+
+    @instrumentation.timed('writer.flush')
+    def _flush(self, batch):
+        start = time.perf_counter()
+        records, sessions, summaries = self._failed_records, self._failed_sessions, self._failed_summaries
+        self._failed_records, self._failed_sessions, self._failed_summaries = [], [], {}
+        waiters = []
+        keep_running = True
+        for item in batch:
+            kind = item[0]
+            if kind == 'record':
+                records.append(item[1])
+            elif kind == 'session':
+                sessions.append(item[1])
+            elif kind == 'summary':
+                if item[1] in summaries:
+                    self.coalesced += 1
+                summaries[item[1]] = item[2]
+            elif kind == 'sync':
+                waiters.append(item[1:])
+            elif kind == 'stop':
+                keep_running = False
+
+        ok = True
+        if records and not self._write('storage.append_records', self.storage.append_records, records):
+            self._failed_records, ok = records, False
+        if sessions and not self._write('storage.log_sessions', self.storage.log_sessions, sessions):
+            self._failed_sessions, ok = sessions, False
+        if summaries and self._failed_sessions:
+            # A summary built now could miss the session log entries that failed
+            self._failed_summaries = summaries
+        elif summaries and not self._write('storage.write_summaries', self._write_summaries, summaries):
+            self._failed_summaries, ok = summaries, False
+
+        elapsed = time.perf_counter() - start
+        instrumentation.count('writer.items', len(batch))
+        self.batches += 1
+        self.items += len(batch)
+        self.flush_seconds += elapsed
+        self.last_flush_seconds = elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        for done, result in waiters:
+            result.append(ok)
+            done.set()
+        return keep_running
+
+    def _write_summaries(self, summaries):
+        self.storage.write_summaries({name: content() if callable(content) else content
+                                      for name, content in summaries.items()})
+
+    def _write(self, span, write, items):
+        # Anything a backend raises (a lock timeout, an encoding error) must not kill the worker
+        try:
+            with instrumentation.span(span):
+                write(items)
+            return True
+        except Exception as e:
+            self.errors += 1
+            print(f"Write-behind flush failed: {e!r}", file=sys.stderr)
+            return False
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": self.batches,
+            "items": self.items,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "retrying": len(self._failed_records) + len(self._failed_sessions) + len(self._failed_summaries),
+            "last_flush_ms": self.last_flush_seconds * 1000,
+            "mean_flush_ms": self.flush_seconds * 1000 / self.batches if self.batches else 0.0,
+            "max_flush_ms": self.max_flush_seconds * 1000,
+        }
@@ -0,0 +1,141 @@
+from bisect import bisect_left
+from collections.abc import MutableMapping, Sequence
+
+from atomic_file import write_atomic
+
+
+class ProjectRegistry(MutableMapping):
+    """Projects keyed by id as {project_id: (name, hotkey)}, with name and hotkey indexes.
+
+    Behaves like the plain dict it replaces, so registry[pid] = (name, hotkey) and
+    del registry[pid] keep the indexes consistent. Lookups by name or hotkey are O(1);
+    search() answers case-insensitive name prefixes from a sorted index.
+    """
+
+    def __init__(self, projects=()):
+        self._records = {}
+        self._by_name = {}
+        self._by_hotkey = {}
+        self._sorted = None  # [(casefolded name, project_id)], rebuilt lazily after changes
+        for project_id, record in dict(projects).items():
+            self[project_id] = record
+
+    @classmethod
+    def load(cls, path):
+        """Read id|name|hotkey lines (id|name from counter_menu.py is accepted too)"""
+        registry = cls()
+        with open(path, 'r') as f:
+            for line in f:
+                parts = line.strip().split('|')
+                if len(parts) == 3:
+                    pid, name, hotkey = parts
+                elif len(parts) == 2:
+                    (pid, name), hotkey = parts, ''
+                else:
+                    continue
+                if pid and name:
+                    registry[pid] = (name, hotkey)
+        return registry
+
+    def save(self, path):
+        write_atomic(path, ''.join(f"{project_id}|{name}|{hotkey}\n" if hotkey else f"{project_id}|{name}\n"
+                                   for project_id, (name, hotkey) in self._records.items()))
+
+    def add(self, project_id, name, hotkey=''):
+        """Add a project; returns False if the name or hotkey is already taken"""
+        if not self.is_free(name, hotkey):
+            return False
+        self[project_id] = (name, hotkey)
+        return True
+
+    def is_free(self, name, hotkey=''):
+        return name not in self._by_name and not (hotkey and hotkey in self._by_hotkey)
+
+    def rename(self, project_id, new_name):
+        """Rename a project; returns False if the new name belongs to another project"""
+        owner = self._by_name.get(new_name)
+        if project_id not in self._records or (owner is not None and owner != project_id):
+            return False
+        self[project_id] = (new_name, self._records[project_id][1])
+        return True
+
+    def id_by_name(self, name):
+        return self._by_name.get(name)
+
+    def id_by_hotkey(self, hotkey):
+        return self._by_hotkey.get(hotkey)
+
+    def name(self, project_id):
+        record = self._records.get(project_id)
+        return record[0] if record is not None else None
+
+    def names(self):
+        return [name for name, _ in self._records.values()]
+
+    def search(self, prefix=''):
+        """Ids of projects whose name starts with prefix (case-insensitive), sorted by name.
+
+        The result is a lazy view; it only reflects the registry as of this call.
+        """
+        if self._sorted is None:
+            self._sorted = sorted((name.casefold(), pid) for pid, (name, _) in self._records.items())
+        key = prefix.casefold()
+        lo = bisect_left(self._sorted, (key,))
+        hi = bisect_left(self._sorted, (key + '\U0010ffff',), lo)
+        return PrefixMatches(self._sorted, lo, hi)
+
+    def __getitem__(self, project_id):
+        return self._records[project_id]
+
+    def __setitem__(self, project_id, record):
+        name, hotkey = record
+        if project_id in self._records:
+            self._unindex(project_id)
+        self._records[project_id] = (name, hotkey)
+        self._sorted = None
+        self._by_name.setdefault(name, project_id)
+        if hotkey:
+            self._by_hotkey.setdefault(hotkey, project_id)
+
+    def __delitem__(self, project_id):
+        self._unindex(project_id)
+        del self._records[project_id]
+        self._sorted = None
+
+    def _unindex(self, project_id):
+        name, hotkey = self._records[project_id]
+        if self._by_name.get(name) == project_id:
+            del self._by_name[name]
+        if self._by_hotkey.get(hotkey) == project_id:
+            del self._by_hotkey[hotkey]
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, project_id):
+        return project_id in self._records
+
+
+class PrefixMatches(Sequence):
+    """Read-only window [lo, hi) of the sorted name index, yielding project ids"""
+
+    def __init__(self, index, lo, hi):
+        self._index = index
+        self._lo = lo
+        self._hi = hi
+
+    def __len__(self):
+        return self._hi - self._lo
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            return [pid for _, pid in self._index[self._lo + start:self._lo + stop:step]]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._index[self._lo + i][1]
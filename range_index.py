@@ -0,0 +1,67 @@
+import math
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime, time
+
+
+def day_ordinal(day):
+    """YYYYMMDD -> proleptic Gregorian ordinal"""
+    return date(int(day[:4]), int(day[4:6]), int(day[6:8])).toordinal()
+
+
+class DayPrefixSums:
+    """Per-project running totals over days, so any run of whole days sums in O(log days).
+
+    Built from {YYYYMMDD: {project_id: seconds}} rollups. Each project keeps the sorted
+    ordinals of the days it has time on and the cumulative seconds up to each of them;
+    the total for [first, stop) is two bisects and a subtraction.
+    """
+
+    def __init__(self, day_totals):
+        self._projects = {}  # project_id -> (array of day ordinals, array of prefix sums)
+        for day in sorted(day_totals):
+            ordinal = day_ordinal(day)
+            for project_id, seconds in day_totals[day].items():
+                entry = self._projects.get(project_id)
+                if entry is None:
+                    entry = self._projects[project_id] = (array('l'), array('q', [0]))
+                days, sums = entry
+                days.append(ordinal)
+                sums.append(sums[-1] + seconds)
+
+    def totals(self, first, stop):
+        """{project_id: seconds} over the whole days first <= ordinal < stop"""
+        totals = {}
+        for project_id, (days, sums) in self._projects.items():
+            lo = bisect_left(days, first)
+            hi = bisect_left(days, stop)
+            if hi > lo:
+                totals[project_id] = sums[hi] - sums[lo]
+        return totals
+
+
+def whole_days(start, end):
+    """Split [start, end) (local timestamps, may be infinite) into whole days and edges.
+
+    Returns (first, stop, edges): the ordinals of the whole days first <= day < stop,
+    and the YYYYMMDD days only partly inside the range, whose records need reading.
+    """
+    if not end > start:
+        return 0, 0, []
+    edges = set()
+    if math.isfinite(start):
+        start_day = datetime.fromtimestamp(start).date()
+        first = start_day.toordinal()
+        if datetime.combine(start_day, time()).timestamp() != start:
+            edges.add(start_day)
+            first += 1
+    else:
+        first = date.min.toordinal()
+    if math.isfinite(end):
+        end_day = datetime.fromtimestamp(end).date()
+        stop = end_day.toordinal()
+        if datetime.combine(end_day, time()).timestamp() != end:
+            edges.add(end_day)
+    else:
+        stop = date.max.toordinal() + 1
+    return first, stop, sorted(day.strftime('%Y%m%d') for day in edges)
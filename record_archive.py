@@ -0,0 +1,174 @@
+"""Cold storage for records moved out of records.txt.
+
+Closed months, and records of projects that have been deleted, are moved into
+gzip-compressed journal files under archive/ next to the journal:
+
+    archive/records_202407.txt.gz       the same project_id|timestamp|seconds lines
+    archive/records_202407.totals.json  their per-day, per-project totals
+    archive/records.manifest.json       the list of archive files
+
+Day, month and range totals over archived history come from the totals files and
+never decompress anything; only reading the records of an archived day does.
+Totals are loaded per month on first use, so everyday queries about the current
+month do not pay for the size of the archive. RecordStore.archive() does the moving:
+
+    python record_archive.py [folder]     archive closed months and deleted projects' records
+"""
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+
+from atomic_file import write_atomic
+
+ARCHIVE_DIR = "archive"
+
+
+class RecordArchive:
+    """The compressed cold files of one journal and the manifest listing them"""
+
+    def __init__(self, folder, stem):
+        self.folder = folder
+        self.stem = stem
+        self.manifest_path = os.path.join(folder, f"{stem}.manifest.json")
+        self.files = {}  # name -> {"month": YYYYMM, "records": n}
+        self.pending = None  # journal swap an interrupted archive() still has to finish
+        self._totals = {}  # name -> {YYYYMMDD: {project_id: seconds}}, loaded on first use
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            self.files, self.pending = manifest['files'], manifest.get('pending')
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError):
+            # The archive files themselves are complete; recount them
+            self.rebuild()
+
+    def save(self):
+        os.makedirs(self.folder, exist_ok=True)
+        write_atomic(self.manifest_path, json.dumps({'files': self.files, 'pending': self.pending}))
+
+    def rebuild(self):
+        """Recreate the manifest from the archive files on disk"""
+        self.files, self.pending, self._totals = {}, None, {}
+        prefix = f"{self.stem}_"
+        for name in sorted(os.listdir(self.folder)):
+            if name.startswith(prefix) and name.endswith('.txt.gz'):
+                entry = self._recount(name)
+                self.files[name] = {"month": name[len(prefix):len(prefix) + 6], "records": entry["records"]}
+        self.save()
+
+    def _recount(self, name):
+        from record_store import parse_record
+        entry = new_entry()
+        for line in self.iter_lines([name]):
+            record = parse_record(line)
+            if record is not None:
+                project_id, timestamp, seconds = record
+                add_record(entry, datetime.fromtimestamp(timestamp).strftime('%Y%m%d'), project_id, seconds)
+        write_atomic(self._totals_path(name), json.dumps(entry["totals"]))
+        self._totals[name] = entry["totals"]
+        return entry
+
+    def _totals_path(self, name):
+        return os.path.join(self.folder, name[:-len('.txt.gz')] + '.totals.json')
+
+    def totals_of(self, name):
+        """{YYYYMMDD: {project_id: seconds}} of one archive file"""
+        totals = self._totals.get(name)
+        if totals is None:
+            try:
+                with open(self._totals_path(name), 'r') as f:
+                    totals = self._totals[name] = json.load(f)
+            except (FileNotFoundError, ValueError):
+                totals = self._recount(name)["totals"]
+        return totals
+
+    def months(self):
+        return {entry["month"] for entry in self.files.values()}
+
+    def day_totals(self, months=None):
+        """{YYYYMMDD: {project_id: seconds}} of the archived records in months (YYYYMM), or of all"""
+        merged = {}
+        for name, entry in self.files.items():
+            if months is not None and entry["month"] not in months:
+                continue
+            for day, totals in self.totals_of(name).items():
+                day_totals = merged.setdefault(day, {})
+                for project_id, seconds in totals.items():
+                    day_totals[project_id] = day_totals.get(project_id, 0) + seconds
+        return merged
+
+    def month_totals(self, month):
+        """{project_id: seconds} archived for month (YYYYMM)"""
+        totals = {}
+        for day_totals in self.day_totals({month}).values():
+            for project_id, seconds in day_totals.items():
+                totals[project_id] = totals.get(project_id, 0) + seconds
+        return totals
+
+    def names_for_months(self, months):
+        return sorted(name for name, entry in self.files.items() if entry["month"] in months)
+
+    def iter_lines(self, names):
+        """Decompressed lines of the named archive files, one at a time"""
+        for name in names:
+            with gzip.open(os.path.join(self.folder, name), 'rt', encoding='utf-8', errors='replace') as f:
+                yield from f
+
+    def new_name(self, month):
+        name = f"{self.stem}_{month}.txt.gz"
+        n = 1
+        while name in self.files:
+            n += 1
+            name = f"{self.stem}_{month}_{n}.txt.gz"
+        return name
+
+    def write_file(self, name, data, entry):
+        """Store gzip data and its totals under name; they stay invisible until commit() lists them.
+        The totals are read back on first use, so archiving while running does not grow memory."""
+        os.makedirs(self.folder, exist_ok=True)
+        write_atomic(os.path.join(self.folder, name), data)
+        write_atomic(self._totals_path(name), json.dumps(entry["totals"]))
+
+    def remove_file(self, name):
+        for path in (os.path.join(self.folder, name), self._totals_path(name)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._totals.pop(name, None)
+
+    def commit(self, entries, pending=None):
+        """List {name: manifest entry} in the manifest, together with a pending journal swap or none"""
+        self.files.update({name: {"month": entry["month"], "records": entry["records"]} for name, entry in entries.items()})
+        self.pending = pending
+        self.save()
+
+
+def new_entry(month=None):
+    return {"month": month, "records": 0, "totals": {}}
+
+
+def add_record(entry, day, project_id, seconds):
+    """Count one record of day (YYYYMMDD) into a manifest entry"""
+    totals = entry["totals"].setdefault(day, {})
+    totals[project_id] = totals.get(project_id, 0) + seconds
+    entry["records"] += 1
+
+
+if __name__ == "__main__":
+    import core
+    folder = sys.argv[1] if len(sys.argv) > 1 else '.'
+    store = core.RecordStore(os.path.join(folder, core.RECORDS_FILE))
+    keep = set(core.load_projects_or_empty(folder))
+    moved = store.archive(datetime.now().strftime('%Y%m'), keep or None)
+    store.close()
+    for month, count in sorted(moved.items()):
+        print(f"{month}: {count} records archived")
+    if not moved:
+        print("Nothing to archive")
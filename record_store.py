@@ -0,0 +1,497 @@
+import json
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+import instrumentation
+from atomic_file import fsync_dir
+from file_lock import FileLock
+from range_index import DayPrefixSums, whole_days
+from record_archive import ARCHIVE_DIR, RecordArchive, add_record, new_entry
+
+
+class RecordStore:
+    """Append-only journal of finished sessions stored as project_id|timestamp|seconds lines.
+
+    A sidecar index (<path>.idx) maps each YYYYMMDD day to the byte ranges holding
+    its records, so loading a day or a month only reads that slice of the journal.
+    The same sidecar carries per-project rollups for every day and month, kept up to
+    date on each append, so day and month totals never touch the journal at all.
+
+    Several processes may share one journal: appends, index writes and compaction
+    take an exclusive lock on <path>.lock, readers a shared one, and a journal
+    replaced by another process's compaction is noticed by its file identity.
+
+    Closed months and deleted projects' records can be moved out of the journal
+    into compressed files under archive/ (see archive()); every query below still
+    includes them, so the journal and its index only grow with recent activity.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + '.idx'
+        self._lock = threading.RLock()  # appends may come from a writer thread
+        self._file_lock = FileLock(path + '.lock')  # other processes on the same folder
+        self._archive_thread = None
+        self._archive = None  # RecordArchive of this journal, loaded with the index
+        self._day_ranges = None  # {YYYYMMDD: [[start, end], ...]}
+        self._day_totals = {}  # {YYYYMMDD: {project_id: seconds}}
+        self._month_totals = {}  # {YYYYMM: {project_id: seconds}}
+        self._prefix_sums = None  # DayPrefixSums over _day_totals, rebuilt lazily after changes
+        self._indexed_size = 0
+        self._identity = None  # (st_dev, st_ino) of the journal the index describes
+        self._index_dirty = False
+
+    @contextmanager
+    def _locked(self, shared=False):
+        with self._lock, self._file_lock.hold(shared):
+            yield
+
+    def append(self, project_id, timestamp, seconds):
+        """Append one finished session and make it durable before returning"""
+        self.append_many([(project_id, timestamp, seconds)])
+
+    @instrumentation.timed('records.append')
+    def append_many(self, records):
+        """Append (project_id, timestamp, seconds) records with a single write and fsync"""
+        lines = [f"{project_id}|{timestamp}|{seconds}\n".encode('utf-8') for project_id, timestamp, seconds in records]
+        if not lines:
+            return
+        with self._locked():
+            self._archived()  # an interrupted archive() swaps the journal; never append to the old one
+            with open(self.path, 'a+b') as f:
+                start = record_start = f.seek(0, os.SEEK_END)
+                prefix = b''
+                if start > 0:
+                    # A crash mid-append can leave a torn last line; never glue a new record onto it
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        prefix = b'\n'
+                        record_start += 1
+                data = prefix + b''.join(lines)
+                f.write(data)
+                instrumentation.count('records.bytes_written', len(data))
+                f.flush()
+                os.fsync(f.fileno())
+                identity = _identity(os.fstat(f.fileno()))
+
+            # Keep the in-memory index and rollups current without rescanning
+            if self._day_ranges is not None and start == self._indexed_size and identity == self._identity:
+                offset = record_start
+                for record, line in zip(records, lines):
+                    self._index_line(*record, offset, offset + len(line))
+                    offset += len(line)
+                self._indexed_size = offset
+                self._index_dirty = True
+
+    def close(self):
+        """Persist the index and rollups if appends changed them"""
+        if not self._file_lock.read_only:
+            with self._locked():
+                if self._index_dirty:
+                    self._refresh_index()
+                    if self._index_dirty:
+                        self._save_index()
+        self._file_lock.close()
+
+    def iter_records(self):
+        """Yield (project_id, timestamp, seconds) for every archived record, then every well-formed journal line.
+
+        Reads a snapshot: lines appended after the call starts are not included.
+        """
+        with self._locked(shared=True):
+            self._refresh_index()
+            archive = self._archive
+            archived = sorted(archive.files, key=lambda name: (archive.files[name]["month"], name))
+            try:
+                f = open(self.path, 'rb')
+            except FileNotFoundError:
+                f = None
+            size = os.fstat(f.fileno()).st_size if f is not None else 0
+        for line in archive.iter_lines(archived):
+            record = parse_record(line)
+            if record is not None:
+                yield record
+        if f is None:
+            return
+        with f:
+            offset = 0
+            for raw in f:
+                offset += len(raw)
+                if offset > size:
+                    break
+                record = parse_record(raw.decode('utf-8', 'replace'))
+                if record is not None:
+                    yield record
+            instrumentation.count('records.bytes_read', min(offset, size))
+
+    def records_for_day(self, day):
+        """Yield records whose timestamp falls on day (YYYYMMDD, local time)"""
+        return self.records_for_days([day])
+
+    def records_for_month(self, month):
+        """Yield records whose timestamp falls in month (YYYYMM, local time)"""
+        with self._locked(shared=True):
+            self._refresh_index()
+            days = {day for day in self._day_ranges if day.startswith(month)} | set(self._archive.day_totals({month}))
+        return self.records_for_days(sorted(days))
+
+    def records_for_days(self, days):
+        with self._locked(shared=True):
+            self._refresh_index()
+            ranges = sorted(tuple(r) for day in days for r in self._day_ranges.get(day, ()))
+            archive = self._archive
+            archived = archive.names_for_months({day[:6] for day in days})
+            # Opened under the lock, so the ranges describe exactly this file even if it is compacted later
+            f = open(self.path, 'rb') if ranges else None
+        if archived:
+            # Archive files never change once listed; only the months asked for are decompressed
+            wanted = set(days)
+            for line in archive.iter_lines(archived):
+                record = parse_record(line)
+                if record is not None and _day(record[1]) in wanted:
+                    yield record
+        if f is None:
+            return
+        with f:
+            for start, end in ranges:
+                f.seek(start)
+                instrumentation.count('records.bytes_read', end - start)
+                # Line by line rather than one read per range: a busy month is still one line in memory
+                for raw in f:
+                    start += len(raw)
+                    if start > end:
+                        break
+                    record = parse_record(raw.decode('utf-8', 'replace'))
+                    if record is not None:
+                        yield record
+                    if start == end:
+                        break
+
+    def days(self):
+        """Sorted list of YYYYMMDD days that have at least one record"""
+        with self._locked(shared=True):
+            self._refresh_index()
+            return sorted(set(self._day_ranges) | set(self._archive.day_totals()))
+
+    def day_totals(self, day):
+        """{project_id: seconds} for day (YYYYMMDD), straight from the rollups"""
+        with self._locked(shared=True):
+            self._refresh_index()
+            return _merged(self._day_totals.get(day, {}), self._archive.day_totals({day[:6]}).get(day, {}))
+
+    def month_totals(self, month):
+        """{project_id: seconds} for month (YYYYMM), straight from the rollups"""
+        with self._locked(shared=True):
+            self._refresh_index()
+            return _merged(self._month_totals.get(month, {}), self._archive.month_totals(month))
+
+    def range_totals(self, start, end):
+        """{project_id: seconds} for start <= timestamp < end (local timestamps, may be infinite).
+
+        Whole days come from per-day prefix sums, O(log days) per project; only the
+        records of the partly covered days at the two edges are read.
+        """
+        first, stop, edges = whole_days(start, end)
+        with self._locked(shared=True):
+            self._refresh_index()
+            if self._prefix_sums is None:
+                day_totals = self._day_totals
+                archived = self._archive.day_totals()
+                if archived:
+                    day_totals = {day: _merged(self._day_totals.get(day, {}), archived.get(day, {}))
+                                  for day in set(day_totals) | set(archived)}
+                self._prefix_sums = DayPrefixSums(day_totals)
+            totals = self._prefix_sums.totals(first, stop)
+        for project_id, timestamp, seconds in self.records_for_days(edges):
+            if start <= timestamp < end:
+                totals[project_id] = totals.get(project_id, 0) + seconds
+        return totals
+
+    def _refresh_index(self):
+        # Load the sidecar once, then only scan bytes appended since it was written.
+        # Callers hold self._locked().
+        self._archived()
+        if self._day_ranges is None:
+            self._load_index()
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset_index()
+            return
+        if self._identity is not None and _identity(st) != self._identity:
+            # Another process compacted or archived the journal; take whatever index and archive it left behind
+            self._archive = None
+            self._archived()
+            self._load_index()
+        self._identity = _identity(st)
+        size = st.st_size
+        if size < self._indexed_size:
+            # Journal was replaced or truncated behind our back; rebuild from scratch
+            self._reset_index()
+        if size == self._indexed_size:
+            if self._index_dirty:
+                self._save_index()
+            return
+
+        offset = self._indexed_size
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break  # half-written line, pick it up next time
+                record = parse_record(raw.decode('utf-8', 'replace'))
+                if record is not None:
+                    self._index_line(*record, offset, offset + len(raw))
+                offset += len(raw)
+        instrumentation.count('records.index_scan_bytes', offset - self._indexed_size)
+        self._indexed_size = offset
+        self._save_index()
+
+    def _index_line(self, project_id, timestamp, seconds, start, end):
+        day = _day(timestamp)
+        ranges = self._day_ranges.setdefault(day, [])
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+
+        day_totals = self._day_totals.setdefault(day, {})
+        day_totals[project_id] = day_totals.get(project_id, 0) + seconds
+        self._prefix_sums = None
+        month_totals = self._month_totals.setdefault(day[:6], {})
+        month_totals[project_id] = month_totals.get(project_id, 0) + seconds
+
+    def _reset_index(self):
+        self._day_ranges, self._day_totals, self._month_totals = {}, {}, {}
+        self._prefix_sums = None
+        self._indexed_size = 0
+        self._identity = None
+        self._index_dirty = False
+
+    @instrumentation.timed('records.index_load')
+    def _load_index(self):
+        self._reset_index()
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            day_ranges, day_totals, size = index['ranges'], index['totals'], int(index['size'])
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return
+
+        # Month rollups are derived, not stored
+        month_totals = {}
+        for day, totals in day_totals.items():
+            month = month_totals.setdefault(day[:6], {})
+            for project_id, seconds in totals.items():
+                month[project_id] = month.get(project_id, 0) + seconds
+        self._day_ranges, self._day_totals, self._month_totals = day_ranges, day_totals, month_totals
+        self._indexed_size = size
+
+    @instrumentation.timed('records.index_save')
+    def _save_index(self):
+        if self._file_lock.read_only:
+            return  # a folder this process may not write to: the index stays in memory
+        # Shared-lock holders may save concurrently, so each process writes its own temp file
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'size': self._indexed_size, 'ranges': self._day_ranges, 'totals': self._day_totals}, f)
+        os.replace(tmp_path, self.index_path)
+        self._index_dirty = False
+
+    def _archived(self):
+        # Callers hold self._locked(). A crash between listing new archive files and swapping in
+        # the trimmed journal is finished here, before the journal is read or appended to.
+        if self._archive is None:
+            archive = RecordArchive(os.path.join(os.path.dirname(self.path), ARCHIVE_DIR),
+                                    os.path.splitext(os.path.basename(self.path))[0])
+            if archive.pending is not None:
+                tmp_path = os.path.join(os.path.dirname(self.path), archive.pending)
+                if os.path.exists(tmp_path):
+                    _remove(self.index_path)
+                    os.replace(tmp_path, self.path)
+                self._reset_index()
+                archive.commit({})
+            self._archive = archive
+            self._prefix_sums = None
+        return self._archive
+
+    @instrumentation.timed('records.archive')
+    def archive(self, before_month, keep_projects=None):
+        """Move records of months before before_month (YYYYMM), and of projects not in
+        keep_projects, into compressed files under archive/; returns {month: records moved}.
+
+        Queries keep including them. Like compact(), the journal is read without
+        blocking appends, and lines appended meanwhile stay in the journal.
+        """
+        def cold(project_id, day):
+            return day[:6] < before_month or (keep_projects is not None and project_id not in keep_projects)
+
+        with self._locked(shared=True):
+            self._refresh_index()
+            if not any(cold(project_id, day) for day, totals in self._day_totals.items() for project_id in totals):
+                return {}
+            src = open(self.path, 'rb')
+            snapshot_size = os.fstat(src.fileno()).st_size
+            archive = self._archive
+
+        folder = os.path.dirname(self.path)
+        tmp_name = f"{os.path.basename(self.path)}.{os.getpid()}.archive"
+        tmp_path = os.path.join(folder, tmp_name)
+        moved = {}  # month -> (gzip compressor, compressed chunks, manifest entry)
+        with src, open(tmp_path, 'wb') as hot:
+            consumed = 0  # whole lines within the snapshot
+            for raw in src:
+                if consumed + len(raw) > snapshot_size or not raw.endswith(b'\n'):
+                    break
+                consumed += len(raw)
+                record = parse_record(raw.decode('utf-8', 'replace'))
+                if record is None:
+                    continue  # malformed, dropped as compact() does
+                project_id, timestamp, seconds = record
+                day = _day(timestamp)
+                if not cold(project_id, day):
+                    hot.write(raw)
+                    continue
+                month = moved.get(day[:6])
+                if month is None:
+                    month = moved[day[:6]] = (zlib.compressobj(6, zlib.DEFLATED, 31), [], new_entry(day[:6]))
+                compressor, chunks, entry = month
+                chunks.append(compressor.compress(raw))
+                add_record(entry, day, project_id, seconds)
+
+            entries = {}
+            for month, (compressor, chunks, entry) in sorted(moved.items()):
+                chunks.append(compressor.flush())
+                name = archive.new_name(month)
+                archive.write_file(name, b''.join(chunks), entry)
+                entries[name] = entry
+
+            with self._locked():
+                if _identity(os.stat(self.path)) != _identity(os.fstat(src.fileno())):
+                    # Compacted or archived by someone else meanwhile; leave it for next time
+                    hot.close()
+                    os.remove(tmp_path)
+                    for name in entries:
+                        archive.remove_file(name)
+                    return {}
+                # Carry over whatever was appended since the snapshot
+                src.seek(consumed)
+                for raw in src:
+                    if parse_record(raw.decode('utf-8', 'replace')) is not None:
+                        hot.write(raw if raw.endswith(b'\n') else raw + b'\n')
+                hot.flush()
+                os.fsync(hot.fileno())
+                hot.close()
+                # The manifest lists the new files and the pending swap in one write; if we crash
+                # before the swap below, _archived() finishes it rather than counting records twice
+                archive.commit(entries, pending=tmp_name)
+                _remove(self.index_path)
+                self._reset_index()
+                os.replace(tmp_path, self.path)
+                fsync_dir(folder or '.')
+                archive.commit({})
+                self._refresh_index()  # index the trimmed journal now rather than on the next start
+        instrumentation.count('records.archived', sum(entry["records"] for entry in entries.values()))
+        return {entry["month"]: entry["records"] for entry in entries.values()}
+
+    def archive_in_background(self, before_month, keep_projects=None):
+        """Start archive() on a daemon thread unless one is already running"""
+        if self._archive_thread is not None and self._archive_thread.is_alive():
+            return self._archive_thread
+        self._archive_thread = threading.Thread(target=self.archive, args=(before_month, keep_projects), daemon=True)
+        self._archive_thread.start()
+        return self._archive_thread
+
+    @instrumentation.timed('records.compact')
+    def compact(self):
+        """Rewrite the journal sorted by timestamp, dropping torn and duplicate lines.
+
+        Appends made while compaction runs, from this process or another, are
+        carried over to the new file.
+        """
+        with self._locked(shared=True):
+            try:
+                src = open(self.path, 'rb')
+            except FileNotFoundError:
+                return
+            snapshot_size = os.fstat(src.fileno()).st_size
+
+        with src:
+            records = set()
+            offset = 0
+            for raw in src:
+                offset += len(raw)
+                if offset > snapshot_size:
+                    break
+                record = parse_record(raw.decode('utf-8', 'replace'))
+                if record is not None:
+                    records.add(record)
+
+            tmp_path = f"{self.path}.{os.getpid()}.compact"
+            with open(tmp_path, 'wb') as out:
+                for project_id, timestamp, seconds in sorted(records, key=lambda r: (r[1], r[0])):
+                    out.write(f"{project_id}|{timestamp}|{seconds}\n".encode('utf-8'))
+
+                with self._locked():
+                    if _identity(os.stat(self.path)) != _identity(os.fstat(src.fileno())):
+                        # Someone else compacted first; their file already holds everything ours would
+                        out.close()
+                        os.remove(tmp_path)
+                        return
+                    # Copy whatever was appended since the snapshot, then swap files atomically
+                    src.seek(snapshot_size)
+                    for raw in src:
+                        if parse_record(raw.decode('utf-8', 'replace')) is not None:
+                            out.write(raw if raw.endswith(b'\n') else raw + b'\n')
+                    out.flush()
+                    os.fsync(out.fileno())
+                    out.close()
+                    src.close()
+                    # Offsets all move; drop the index first so it can never describe the new file
+                    if os.path.exists(self.index_path):
+                        os.remove(self.index_path)
+                    self._reset_index()
+                    os.replace(tmp_path, self.path)
+
+
+def _identity(st):
+    return st.st_dev, st.st_ino
+
+
+def _day(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y%m%d')
+
+
+def _merged(*totals):
+    merged = {}
+    for part in totals:
+        for project_id, seconds in part.items():
+            merged[project_id] = merged.get(project_id, 0) + seconds
+    return merged
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def parse_record(line):
+    parts = line.strip().split('|')
+    if len(parts) != 3:
+        return None
+    project_id, timestamp, seconds = parts
+    try:
+        return project_id, float(timestamp), int(seconds)
+    except ValueError:
+        return None
+
+
+if __name__ == "__main__":
+    import sys
+    path = sys.argv[1] if len(sys.argv) > 1 else "records.txt"
+    RecordStore(path).compact()
@@ -0,0 +1,137 @@
+"""Headless reports over a TicoCounter data folder.
+
+    python report.py --day 20250714
+    python report.py --month 202507 --format csv --dir /home/alice/tico
+    python report.py --quarter 2025Q3 --by month
+    python report.py --from 20240101 --to 20241231 --by quarter --project "ACME"
+    python report.py --month 202507 --binary records.bin
+    python report.py --day 20250714 --db tico.db
+
+Prints per-project totals without starting Tk, optionally split by period.
+"""
+import argparse
+import csv
+import json
+import sys
+from datetime import datetime
+
+import core
+from storage import TextStorage
+
+
+def render(totals, fmt, out):
+    if fmt == 'json':
+        json.dump(totals, out, indent=2, sort_keys=True)
+        out.write('\n')
+    elif fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(['project', 'seconds', 'time'])
+        for project in sorted(totals):
+            writer.writerow([project, totals[project], core.format_time(totals[project])])
+    else:
+        for project in sorted(totals):
+            out.write(f"{project}: {core.format_time(totals[project])}\n")
+
+
+def render_breakdown(breakdown, fmt, out):
+    if fmt == 'json':
+        json.dump(breakdown, out, indent=2, sort_keys=True)
+        out.write('\n')
+    elif fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(['period', 'project', 'seconds', 'time'])
+        for label, totals in breakdown.items():
+            for project in sorted(totals):
+                writer.writerow([label, project, totals[project], core.format_time(totals[project])])
+    else:
+        out.write(core.format_breakdown(breakdown))
+
+
+def report_range(parser, args):
+    """[start, end) local timestamps selected by the period options"""
+    try:
+        if args.month:
+            return core.month_bounds(args.month)
+        if args.week:
+            return core.period_bounds('week', core.parse_day(args.week))
+        if args.quarter:
+            return core.quarter_bounds(args.quarter)
+        if args.year:
+            return core.period_bounds('year', datetime(int(args.year), 1, 1))
+        if args.start:
+            last = core.parse_day(args.to) if args.to else datetime.now()
+            return core.parse_day(args.start).timestamp(), core.period_bounds('day', last)[1]
+        return core.day_bounds(args.day or datetime.now().strftime('%Y%m%d'))
+    except ValueError as e:
+        parser.error(str(e))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print per-project time totals for a day, week, month, "
+                                                 "quarter, year or any range of days.")
+    period = parser.add_mutually_exclusive_group()
+    period.add_argument('--day', help="YYYYMMDD (default: today)")
+    period.add_argument('--week', metavar='DAY', help="the Monday to Sunday week holding DAY (YYYYMMDD)")
+    period.add_argument('--month', help="YYYYMM")
+    period.add_argument('--quarter', help="YYYYQn, e.g. 2025Q3")
+    period.add_argument('--year', help="YYYY")
+    period.add_argument('--from', dest='start', metavar='DAY', help="first day (YYYYMMDD) of a custom range")
+    parser.add_argument('--to', metavar='DAY', help="last day (YYYYMMDD) of a --from range, inclusive (default: today)")
+    parser.add_argument('--by', choices=core.PERIODS, help="split the totals by period")
+    parser.add_argument('--project', action='append', metavar='NAME', help="only this project (repeatable)")
+    parser.add_argument('--format', choices=['text', 'csv', 'json'], default='text')
+    parser.add_argument('--dir', default='.', help="folder holding projects.txt and records.txt")
+    data = parser.add_mutually_exclusive_group()
+    data.add_argument('--binary', metavar='FILE', help="read records from a binary_records.py file instead")
+    data.add_argument('--db', metavar='FILE', help="read everything from a SQLite database instead")
+    args = parser.parse_args(argv)
+    if args.day and not (len(args.day) == 8 and args.day.isdigit()):
+        parser.error("--day must be YYYYMMDD")
+    if args.month and not (len(args.month) == 6 and args.month.isdigit()):
+        parser.error("--month must be YYYYMM")
+    if args.year and not (len(args.year) == 4 and args.year.isdigit()):
+        parser.error("--year must be YYYY")
+    if args.to and not args.start:
+        parser.error("--to needs --from")
+    start, end = report_range(parser, args)
+
+    # Backends are imported only when asked for: vector_aggregate loads NumPy, which would dominate startup
+    if args.binary:
+        import vector_aggregate
+        from binary_records import BinaryRecords
+        records = BinaryRecords(args.binary)
+        try:
+            if args.by:
+                breakdown = vector_aggregate.period_totals(records, start, end, args.by)
+            else:
+                breakdown = vector_aggregate.range_totals(records, start, end)
+        finally:
+            records.close()
+        projects = core.load_projects_or_empty(args.dir)
+    else:
+        if args.db:
+            from sqlite_storage import SqliteStorage
+        storage = SqliteStorage(args.db) if args.db else TextStorage(args.dir)
+        try:
+            breakdown = core.range_breakdown(storage.range_totals, start, end, args.by)
+            try:
+                projects = storage.load_projects()
+            except FileNotFoundError:
+                projects = {}
+        finally:
+            storage.close()
+
+    def named(totals_by_id):
+        totals = core.name_totals(totals_by_id, projects)
+        if args.project:
+            totals = {name: seconds for name, seconds in totals.items() if name in args.project}
+        return totals
+
+    if args.by:
+        render_breakdown({label: named(totals) for label, totals in breakdown.items()}, args.format, sys.stdout)
+    else:
+        render(named(breakdown), args.format, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import json
+import os
+from collections import OrderedDict
+
+import core
+import instrumentation
+
+CACHE_FILE = "session_cache.json"
+MAX_ENTRIES = 5000  # a few years of session logs and summaries; least recently used go first
+
+
+class SessionCache:
+    """Per-project totals of session log and summary files, kept across restarts.
+
+    Entries are keyed by path relative to the folder and checked against the file's mtime and size,
+    so a file is only parsed again after it changed. Finished session logs and
+    old summaries never change, which makes rebuilding a day or a month after a
+    restart cost only the files still being written.
+    """
+
+    def __init__(self, folder, max_entries=MAX_ENTRIES):
+        self.folder = folder
+        self.path = os.path.join(folder, CACHE_FILE)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # name -> (mtime_ns, size, {project name: seconds}), oldest use first
+        self._dirty = False
+        self._load()
+
+    def totals(self, name):
+        """{project name: seconds} for the session or summary file name (relative), parsing it only if it changed"""
+        try:
+            st = os.stat(os.path.join(self.folder, name))
+        except FileNotFoundError:
+            self.forget(name)
+            return {}
+        # Stat before parsing: an append racing the parse changes the key, so the next call re-reads
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            self._entries.move_to_end(name)
+            instrumentation.count('session_cache.hits')
+            return dict(entry[2])
+
+        instrumentation.count('session_cache.misses')
+        totals = core.sum_session_times(os.path.join(self.folder, name))
+        self._entries[name] = (st.st_mtime_ns, st.st_size, totals)
+        self._entries.move_to_end(name)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            instrumentation.count('session_cache.evictions')
+        self._dirty = True
+        return dict(totals)
+
+    def forget(self, name):
+        if self._entries.pop(name, None) is not None:
+            self._dirty = True
+
+    def prune(self, names, folder=''):
+        """Drop entries under folder (relative) for files no longer in names, a full listing of it"""
+        present = set(names)
+        for name in [name for name in self._entries if name.startswith(folder) and name not in present]:
+            self.forget(name)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)['entries']
+            for name, mtime_ns, size, totals in entries:
+                self._entries[name] = (int(mtime_ns), int(size), {str(k): int(v) for k, v in totals.items()})
+        except (FileNotFoundError, ValueError, KeyError, TypeError, AttributeError):
+            # A cache only: anything unreadable is rebuilt from the files
+            self._entries.clear()
+
+    def save(self):
+        if not self._dirty:
+            return
+        # Several instances may share a folder, so each process writes its own temp file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'entries': [[name, mtime_ns, size, totals]
+                                   for name, (mtime_ns, size, totals) in self._entries.items()]}, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,198 @@
+"""Session logs: one append-only segment per day, sharded into a folder per month.
+
+    sessions/2025/07/session_20250714.txt
+
+Each line is "<logged_at> - <project name>: HH:MM:SS", filed under the day it was
+logged, so a day or month lookup lists only its own sessions/YYYY/MM folder.
+Earlier versions wrote one session_YYYYMMDD_HHMMSS.txt per run next to
+records.txt; migrate() folds those into the segments (the app does it at start):
+
+    python session_log.py migrate [folder]
+"""
+import json
+import os
+import re
+import shutil
+import sys
+from datetime import datetime
+
+import core
+from atomic_file import fsync_dir, write_atomic
+from file_lock import FileLock
+
+SESSIONS_DIR = "sessions"
+LEGACY_NAME = re.compile(r'session_(\d{8})(_\d+)?\.txt$')
+MIGRATION_LOCK = os.path.join(SESSIONS_DIR, "migration.lock")
+MIGRATION_MANIFEST = os.path.join(SESSIONS_DIR, "migration.json")  # segment sizes before an unfinished pass
+UNMIGRATED_DIR = os.path.join(SESSIONS_DIR, "unmigrated")
+BATCH_LINES = 100_000
+
+
+def shard_name(prefix):
+    """Folder of the segments for prefix (YYYYMM or YYYYMMDD), relative to the data folder"""
+    return os.path.join(SESSIONS_DIR, prefix[:4], prefix[4:6])
+
+
+def segment_name(day):
+    """Segment of day (YYYYMMDD), relative to the data folder"""
+    return os.path.join(shard_name(day), f"session_{day}.txt")
+
+
+def entry_day(logged_at):
+    """YYYYMMDD of a 'YYYY-mm-dd HH:MM:SS' logged_at"""
+    return logged_at[:10].replace('-', '')
+
+
+def format_entry(logged_at, project_name, seconds):
+    return f"{logged_at} - {project_name}: {core.format_time(seconds)}\n"
+
+
+def segment_names(data_dir, prefix):
+    """Segments of the days starting with prefix (YYYYMM or YYYYMMDD); lists one month folder"""
+    shard = shard_name(prefix)
+    try:
+        names = os.listdir(os.path.join(data_dir, shard))
+    except FileNotFoundError:
+        return []
+    return sorted(os.path.join(shard, name) for name in names
+                  if name.startswith(f"session_{prefix}") and name.endswith('.txt'))
+
+
+def all_segment_names(data_dir):
+    """Every segment, oldest month first"""
+    names = []
+    root = os.path.join(data_dir, SESSIONS_DIR)
+    for year in sorted(n for n in _listdir(root) if n.isdigit() and len(n) == 4):
+        for month in sorted(n for n in _listdir(os.path.join(root, year)) if n.isdigit() and len(n) == 2):
+            names += segment_names(data_dir, year + month)
+    return names
+
+
+def append(data_dir, lines_by_day):
+    """Append {YYYYMMDD: [line, ...]} to the day segments and fsync them; returns the characters written"""
+    written = 0
+    for day, lines in lines_by_day.items():
+        path = os.path.join(data_dir, segment_name(day))
+        try:
+            f = open(path, 'a')
+        except FileNotFoundError:  # first entry of a month
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = open(path, 'a')
+        with f:
+            text = ''.join(lines)
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        written += len(text)
+    return written
+
+
+def migrate(data_dir='.'):
+    """Fold per-run session_*.txt files from the top of data_dir into the day segments.
+
+    Lines are copied unchanged and filed under the day they were logged. Safe to
+    interrupt: the old files are first moved into sessions/unmigrated, and a rerun
+    rolls the segments back to their size before the unfinished pass. Returns the
+    number of files folded in.
+    """
+    legacy = [name for name in os.listdir(data_dir) if LEGACY_NAME.match(name)]
+    unmigrated = os.path.join(data_dir, UNMIGRATED_DIR)
+    manifest_path = os.path.join(data_dir, MIGRATION_MANIFEST)
+    if not legacy and not os.path.isdir(unmigrated):
+        # A finished pass may have stopped before clearing up after itself
+        _remove(manifest_path)
+        for name in _listdir(os.path.join(data_dir, SESSIONS_DIR)):
+            if name.startswith('migrated_'):
+                shutil.rmtree(os.path.join(data_dir, SESSIONS_DIR, name), ignore_errors=True)
+        return 0
+
+    os.makedirs(os.path.join(data_dir, SESSIONS_DIR), exist_ok=True)
+    lock = FileLock(os.path.join(data_dir, MIGRATION_LOCK), timeout=300)
+    try:
+        with lock.hold():
+            return _migrate_locked(data_dir, unmigrated, manifest_path)
+    finally:
+        lock.close()
+
+
+def _migrate_locked(data_dir, unmigrated, manifest_path):
+    # Another instance may have finished while this one waited for the lock
+    os.makedirs(unmigrated, exist_ok=True)
+    for name in [name for name in os.listdir(data_dir) if LEGACY_NAME.match(name)]:
+        os.replace(os.path.join(data_dir, name), os.path.join(unmigrated, name))
+    fsync_dir(data_dir)
+    fsync_dir(unmigrated)
+
+    try:
+        with open(manifest_path, 'r') as f:
+            rollback = json.load(f)
+    except FileNotFoundError:
+        rollback = {}
+    for name, size in rollback.items():
+        path = os.path.join(data_dir, name)
+        if size:
+            os.truncate(path, size)
+        else:
+            _remove(path)
+
+    sizes = {}
+    lines_by_day = {}
+    pending = 0
+
+    def flush():
+        # Record the size of every segment this batch touches before appending to it
+        new = [name for name in map(segment_name, lines_by_day) if name not in sizes]
+        if new:
+            for name in new:
+                path = os.path.join(data_dir, name)
+                sizes[name] = os.path.getsize(path) if os.path.exists(path) else 0
+            write_atomic(manifest_path, json.dumps(sizes))
+        append(data_dir, lines_by_day)
+        lines_by_day.clear()
+
+    names = sorted(name for name in os.listdir(unmigrated) if LEGACY_NAME.match(name))
+    for name in names:
+        file_day = LEGACY_NAME.match(name).group(1)
+        with open(os.path.join(unmigrated, name), 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                day = entry_day(line.split(" - ", 1)[0]) if " - " in line else file_day
+                if not (len(day) == 8 and day.isdigit()):
+                    day = file_day
+                lines_by_day.setdefault(day, []).append(line if line.endswith('\n') else line + '\n')
+                pending += 1
+        if pending >= BATCH_LINES:
+            flush()
+            pending = 0
+    flush()
+
+    # One rename marks the pass as done; only then are the old files deleted
+    done = os.path.join(data_dir, SESSIONS_DIR, f"migrated_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.replace(unmigrated, done)
+    fsync_dir(os.path.join(data_dir, SESSIONS_DIR))
+    _remove(manifest_path)
+    shutil.rmtree(done, ignore_errors=True)
+    return len(names)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _listdir(path):
+    try:
+        return os.listdir(path)
+    except FileNotFoundError:
+        return []
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3) or sys.argv[1] != 'migrate':
+        print(__doc__)
+        sys.exit(2)
+    folder = sys.argv[2] if len(sys.argv) == 3 else '.'
+    print(f"Moved {migrate(folder)} session files into {os.path.join(folder, SESSIONS_DIR)}")
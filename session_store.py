@@ -0,0 +1,67 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class ProjectSessions:
+    """Sessions of one project as two parallel columns, kept sorted by end timestamp"""
+
+    __slots__ = ('timestamps', 'seconds')
+
+    def __init__(self):
+        self.timestamps = array('d')
+        self.seconds = array('q')
+
+    def add(self, timestamp, seconds):
+        if not self.timestamps or timestamp >= self.timestamps[-1]:
+            self.timestamps.append(timestamp)
+            self.seconds.append(seconds)
+        else:
+            # Out-of-order insert (e.g. legacy unsorted records.txt); keep columns aligned
+            i = bisect_right(self.timestamps, timestamp)
+            self.timestamps.insert(i, timestamp)
+            self.seconds.insert(i, seconds)
+
+    def span(self, start=None, end=None):
+        """Index range [lo, hi) of sessions with start <= timestamp <= end"""
+        lo = 0 if start is None else bisect_left(self.timestamps, start)
+        hi = len(self.timestamps) if end is None else bisect_right(self.timestamps, end)
+        return lo, hi
+
+    def total(self, start=None, end=None):
+        lo, hi = self.span(start, end)
+        return sum(self.seconds[lo:hi])
+
+    def __iter__(self):
+        return zip(self.timestamps, self.seconds)
+
+
+class SessionStore:
+    """Per-project columnar session store: {project_id: ProjectSessions}"""
+
+    def __init__(self, project_ids=()):
+        self._projects = {pid: ProjectSessions() for pid in project_ids}
+
+    @classmethod
+    def from_interleaved(cls, records):
+        """Build from the old {project_id: [timestamp, seconds, ...]} layout"""
+        store = cls(records.keys())
+        for project_id, times in records.items():
+            for i in range(0, len(times) - 1, 2):
+                store.add(project_id, times[i], int(times[i + 1]))
+        return store
+
+    def to_interleaved(self):
+        return {pid: [value for pair in sessions for value in pair] for pid, sessions in self._projects.items()}
+
+    def add(self, project_id, timestamp, seconds):
+        sessions = self._projects.get(project_id)
+        if sessions is None:
+            sessions = self._projects[project_id] = ProjectSessions()
+        sessions.add(timestamp, seconds)
+
+    def totals(self, start=None, end=None):
+        """{project_id: seconds} for sessions ending in [start, end]"""
+        return {pid: sessions.total(start, end) for pid, sessions in self._projects.items()}
+
+    def items(self):
+        return self._projects.items()
@@ -0,0 +1,174 @@
+"""SQLite storage backend, and a bulk importer for existing text data.
+
+    python counter.py --db tico.db
+    python sqlite_storage.py import DATA_DIR tico.db
+"""
+import os
+import sqlite3
+import sys
+import threading
+
+import core
+import session_log
+import streams
+from project_registry import ProjectRegistry
+from record_store import RecordStore
+from storage import Storage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    hotkey TEXT NOT NULL DEFAULT '',
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    project_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    seconds INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_project_time ON records (project_id, timestamp);
+CREATE INDEX IF NOT EXISTS records_time ON records (timestamp);
+CREATE TABLE IF NOT EXISTS sessions (
+    session TEXT NOT NULL,
+    day TEXT NOT NULL,
+    logged_at TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    seconds INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_day ON sessions (day);
+CREATE TABLE IF NOT EXISTS summaries (
+    name TEXT PRIMARY KEY,
+    content TEXT NOT NULL
+);
+"""
+
+
+class SqliteStorage(Storage):
+    """Everything in one SQLite database (WAL mode); reports are indexed aggregate queries"""
+
+    def __init__(self, path):
+        self.path = path
+        # Shared by the UI and write-behind threads, so serialize access ourselves
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def load_projects(self):
+        with self._lock:
+            rows = self._db.execute("SELECT id, name, hotkey FROM projects ORDER BY position").fetchall()
+        if not rows:
+            raise FileNotFoundError(f"no projects stored in {self.path}")
+        return ProjectRegistry({pid: (name, hotkey) for pid, name, hotkey in rows})
+
+    def save_projects(self, registry):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM projects")
+            self._db.executemany("INSERT INTO projects (id, name, hotkey, position) VALUES (?, ?, ?, ?)",
+                                 [(pid, name, hotkey, i) for i, (pid, (name, hotkey)) in enumerate(registry.items())])
+
+    def append_records(self, records):
+        with self._lock, self._db:
+            self._db.executemany("INSERT INTO records (project_id, timestamp, seconds) VALUES (?, ?, ?)", records)
+
+    def log_sessions(self, entries):
+        rows = [(session, logged_at[:10].replace('-', ''), logged_at, project_name, seconds)
+                for session, logged_at, project_name, seconds in entries]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO sessions (session, day, logged_at, project_name, seconds) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def write_summaries(self, summaries):
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO summaries (name, content) VALUES (?, ?)",
+                                 list(summaries.items()))
+
+    def day_totals(self, day):
+        return self.range_totals(*core.day_bounds(day))
+
+    def month_totals(self, month):
+        return self.range_totals(*core.month_bounds(month))
+
+    def range_totals(self, start, end):
+        with self._lock:
+            return dict(self._db.execute(
+                "SELECT project_id, SUM(seconds) FROM records WHERE timestamp >= ? AND timestamp < ? "
+                "GROUP BY project_id", (start, end)))
+
+    def session_totals(self, day):
+        with self._lock:
+            return dict(self._db.execute(
+                "SELECT project_name, SUM(seconds) FROM sessions WHERE day = ? GROUP BY project_name", (day,)))
+
+    def summary(self, name):
+        with self._lock:
+            row = self._db.execute("SELECT content FROM summaries WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def import_text_data(data_dir, storage):
+    """Bulk-load projects.txt, records.txt, session logs and summaries from a text data folder"""
+    if storage.range_totals(float('-inf'), float('inf')):
+        raise ValueError(f"{storage.path} already holds records; import into a fresh database")
+    counts = {'projects': 0, 'records': 0, 'sessions': 0, 'summaries': 0}
+
+    projects_file = os.path.join(data_dir, core.PROJECTS_FILE)
+    if os.path.exists(projects_file):
+        registry = ProjectRegistry.load(projects_file)
+        storage.save_projects(registry)
+        counts['projects'] = len(registry)
+
+    batch = []
+    for record in RecordStore(os.path.join(data_dir, core.RECORDS_FILE)).iter_records():
+        batch.append(record)
+        if len(batch) >= 50_000:
+            storage.append_records(batch)
+            counts['records'] += len(batch)
+            batch = []
+    storage.append_records(batch)
+    counts['records'] += len(batch)
+
+    summaries = {}
+    for name in sorted(os.listdir(data_dir)):
+        path = os.path.join(data_dir, name)
+        if name.startswith('session_') and name.endswith('.txt'):
+            entries = list(_read_session_log(path, name[:-4]))
+            storage.log_sessions(entries)
+            counts['sessions'] += len(entries)
+        elif name.endswith('.txt') and '_Summary_' in name:
+            with open(path, 'r') as f:
+                summaries[name[:-4]] = f.read()
+    for name in session_log.all_segment_names(data_dir):
+        entries = list(_read_session_log(os.path.join(data_dir, name), os.path.basename(name)[:-4]))
+        storage.log_sessions(entries)
+        counts['sessions'] += len(entries)
+    storage.write_summaries(summaries)
+    counts['summaries'] = len(summaries)
+    return counts
+
+
+def _read_session_log(path, session):
+    with open(path, 'r') as f:
+        for entry in streams.parse_session_log(f):
+            if entry.logged_at is not None:
+                yield session, entry.logged_at, entry.project_name, entry.seconds
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != 'import':
+        print(__doc__)
+        sys.exit(2)
+    db = SqliteStorage(sys.argv[3])
+    try:
+        print(import_text_data(sys.argv[2], db))
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    finally:
+        db.close()
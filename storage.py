@@ -0,0 +1,144 @@
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+import atomic_file
+import core
+import instrumentation
+import session_log
+from project_registry import ProjectRegistry
+from record_store import RecordStore
+from session_cache import SessionCache
+
+
+class Storage(ABC):
+    """Where TimeTracker keeps projects, finished sessions, session logs and summaries.
+
+    Records are (project_id, end timestamp, seconds). Session log entries are
+    (session, logged_at 'YYYY-mm-dd HH:MM:SS', project name, seconds), where session
+    names one run of the timer page (session_YYYYMMDD_HHMMSS). Summaries are named
+    report texts such as Daily_Summary_YYYYMMDD. The batch methods are called from
+    the write-behind thread; everything else from the UI thread.
+    """
+
+    @abstractmethod
+    def load_projects(self):
+        """ProjectRegistry of stored projects; raises FileNotFoundError if there are none yet"""
+
+    @abstractmethod
+    def save_projects(self, registry):
+        pass
+
+    @abstractmethod
+    def append_records(self, records):
+        pass
+
+    @abstractmethod
+    def log_sessions(self, entries):
+        pass
+
+    @abstractmethod
+    def write_summaries(self, summaries):
+        """Store {name: text}, replacing earlier versions"""
+
+    @abstractmethod
+    def day_totals(self, day):
+        """{project_id: seconds} for day (YYYYMMDD)"""
+
+    @abstractmethod
+    def month_totals(self, month):
+        """{project_id: seconds} for month (YYYYMM)"""
+
+    @abstractmethod
+    def range_totals(self, start, end):
+        """{project_id: seconds} for records with start <= timestamp < end"""
+
+    @abstractmethod
+    def session_totals(self, day):
+        """{project name: seconds} from the session logs of day (YYYYMMDD)"""
+
+    def recover(self):
+        """Startup check for damage left by a crash; returns a list of messages for the user"""
+        return []
+
+    def archive(self, keep_projects):
+        """Optional housekeeping: move records of closed months and of projects not in
+        keep_projects out of the way of everyday reads; may run in the background"""
+        return None
+
+    def close(self):
+        pass
+
+
+class TextStorage(Storage):
+    """The original layout: projects.txt, records.txt and *_Summary_*.txt in one folder, session logs under sessions/"""
+
+    def __init__(self, data_dir='.'):
+        self.data_dir = data_dir
+        self.projects_file = os.path.join(data_dir, core.PROJECTS_FILE)
+        self.record_store = RecordStore(os.path.join(data_dir, core.RECORDS_FILE))
+        self.session_cache = SessionCache(data_dir)
+
+    def load_projects(self):
+        return ProjectRegistry.load(self.projects_file)
+
+    def save_projects(self, registry):
+        registry.save(self.projects_file)
+
+    def append_records(self, records):
+        self.record_store.append_many(records)
+
+    def log_sessions(self, entries):
+        lines = {}
+        for session, logged_at, project_name, seconds in entries:
+            lines.setdefault(session_log.entry_day(logged_at), []).append(
+                session_log.format_entry(logged_at, project_name, seconds))
+        instrumentation.count('session_files.bytes_written', session_log.append(self.data_dir, lines))
+
+    def write_summaries(self, summaries):
+        atomic_file.write_atomic_many({os.path.join(self.data_dir, f"{name}.txt"): text
+                                       for name, text in summaries.items()})
+
+    def day_totals(self, day):
+        return self.record_store.day_totals(day)
+
+    def month_totals(self, month):
+        return self.record_store.month_totals(month)
+
+    def range_totals(self, start, end):
+        return self.record_store.range_totals(start, end)
+
+    @instrumentation.timed('storage.session_totals')
+    def session_totals(self, day):
+        combined_times = {}
+        # Prune against the whole month folder, then read only the segments asked for
+        month_names = session_log.segment_names(self.data_dir, day[:6])
+        self.session_cache.prune(month_names, session_log.shard_name(day))
+        names = [name for name in month_names if os.path.basename(name).startswith(f"session_{day}")]
+        for name in names:
+            for project, seconds in self.session_cache.totals(name).items():
+                combined_times[project] = combined_times.get(project, 0) + seconds
+        self.session_cache.save()
+        return combined_times
+
+    def recover(self):
+        messages = [f"Removed {name}, left over from an interrupted save"
+                    for name in atomic_file.recover(self.data_dir)]
+        migrated = session_log.migrate(self.data_dir)
+        if migrated:
+            messages.append(f"Moved {migrated} session_*.txt files into one log per day under "
+                            f"{session_log.SESSIONS_DIR}{os.sep}YYYY{os.sep}MM")
+        # Saves are atomic now, but a projects.txt truncated by an older version must not be
+        # silently replaced by the default projects; keep it aside for the user
+        if os.path.exists(self.projects_file) and not ProjectRegistry.load(self.projects_file):
+            damaged = self.projects_file + '.damaged'
+            os.replace(self.projects_file, damaged)
+            messages.append(f"{core.PROJECTS_FILE} held no projects; kept it as {os.path.basename(damaged)}")
+        return messages
+
+    def archive(self, keep_projects):
+        return self.record_store.archive_in_background(datetime.now().strftime('%Y%m'), set(keep_projects))
+
+    def close(self):
+        self.record_store.close()
+        self.session_cache.save()
@@ -0,0 +1,66 @@
+"""Lazy parse, filter and aggregate stages for records and session logs.
+
+Each stage takes an iterable and returns an iterator, so a pipeline such as
+
+    sum_by(in_range(store.iter_records(), start, end), 0, 2)
+
+holds one line at a time plus the running totals, whatever the size of the input.
+Records are (project_id, timestamp, seconds) tuples as everywhere else; the
+journal readers in record_store.py already yield them one line at a time.
+"""
+from collections import namedtuple
+from itertools import dropwhile, takewhile
+
+SessionEntry = namedtuple('SessionEntry', 'logged_at project_name seconds')  # logged_at is None in summaries
+
+
+def parse_time(time_str):
+    """Seconds from H:M:S, the inverse of core.format_time; raises ValueError on anything else"""
+    h, m, s = map(int, time_str.split(':'))
+    return h * 3600 + m * 60 + s
+
+
+def parse_session_log(lines):
+    """SessionEntry items from session log lines ("<logged_at> - <name>: HH:MM:SS") or summary lines"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        logged_at = None
+        if " - " in line:
+            logged_at, line = line.split(" - ", 1)
+
+        parts = line.split(': ')
+        if len(parts) != 2:
+            continue
+        project_name = parts[0]
+        if '(' in project_name:  # Handle "(hotkey)name" format
+            project_name = project_name[3:]  # Remove "(n)" prefix
+        try:
+            seconds = parse_time(parts[1])
+        except ValueError:
+            continue
+        yield SessionEntry(logged_at, project_name, seconds)
+
+
+def in_range(records, start=None, end=None, ordered=False):
+    """Records with start <= timestamp < end.
+
+    With ordered=True the input must be sorted by timestamp: leading records are
+    skipped and iteration stops at the first record past end, without reading the rest.
+    """
+    if ordered:
+        if start is not None:
+            records = dropwhile(lambda r: r[1] < start, records)
+        if end is not None:
+            records = takewhile(lambda r: r[1] < end, records)
+        return iter(records)
+    return (r for r in records if (start is None or r[1] >= start) and (end is None or r[1] < end))
+
+
+def sum_by(items, key, value):
+    """{item[key]: sum of item[value]} over items"""
+    totals = {}
+    for item in items:
+        totals[item[key]] = totals.get(item[key], 0) + item[value]
+    return totals
@@ -0,0 +1,58 @@
+import time
+
+
+class SwitchBuffer:
+    """Sessions finished by project switches, held until switching pauses.
+
+    A hotkey press only appends the finished session here and returns; once no
+    switch has happened for `window` seconds the caller takes the batch and
+    persists it in one go. Sessions under a second (the projects skipped past
+    while tapping through hotkeys) are dropped, and back-to-back sessions of the
+    same project merge into one, so A -> B -> A within a second leaves one A session.
+    """
+
+    def __init__(self, window=0.5):
+        self.window = window
+        self._pending = []  # [project_id, end timestamp, seconds]
+        self._last_switch = None
+        self.switches = 0
+        self.dropped = 0
+        self.merged = 0
+        self.commits = 0
+
+    def add(self, project_id, end, seconds):
+        self.switches += 1
+        self._last_switch = time.monotonic()
+        if seconds <= 0:
+            self.dropped += 1
+            return
+        if self._pending and self._pending[-1][0] == project_id:
+            last = self._pending[-1]
+            last[1] = end
+            last[2] += seconds
+            self.merged += 1
+            return
+        self._pending.append([project_id, end, seconds])
+
+    def due_in(self):
+        """Seconds until the batch should be committed, 0 if now, None if nothing is pending"""
+        if not self._pending:
+            return None
+        return max(0.0, self._last_switch + self.window - time.monotonic())
+
+    def take(self):
+        """The pending (project_id, end timestamp, seconds) sessions, oldest first; empties the buffer"""
+        sessions = [tuple(session) for session in self._pending]
+        self._pending.clear()
+        if sessions:
+            self.commits += 1
+        return sessions
+
+    def stats(self):
+        return {
+            "switches": self.switches,
+            "dropped_zero_length": self.dropped,
+            "merged": self.merged,
+            "commits": self.commits,
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,74 @@
+import sys
+import time
+import traceback
+
+RETRY_MS = 1000  # a job that raised runs again after this long
+
+
+class TickScheduler:
+    """One root.after() loop that drives every periodic UI job.
+
+    Jobs are registered by name, so registering again replaces instead of stacking.
+    Each job returns the milliseconds until it next needs to run, or None when it has
+    nothing to do; the scheduler sleeps until the earliest request and stops
+    rescheduling entirely once every job is idle. Call wake() when a job has work again.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._jobs = {}
+        self._after_id = None
+        self._idle_pending = False  # the pending tick runs on the next idle pass, not at a later time
+        self.ticks = 0
+        self.tick_seconds = 0.0
+        self.max_tick_seconds = 0.0
+        self.errors = 0
+
+    def register(self, name, job):
+        self._jobs[name] = job
+        self.wake()
+
+    def unregister(self, name):
+        self._jobs.pop(name, None)
+
+    def wake(self):
+        # Run on the next idle pass; a tick pending for later (e.g. the midnight rollover) is brought forward
+        if self._after_id is not None:
+            if self._idle_pending:
+                return
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after_idle(self._tick)
+        self._idle_pending = True
+
+    def _tick(self):
+        self._after_id = None
+        self._idle_pending = False
+        start = time.perf_counter()
+        delays = [delay for delay in (self._run(name, job) for name, job in list(self._jobs.items())) if delay is not None]
+        elapsed = time.perf_counter() - start
+
+        self.ticks += 1
+        self.tick_seconds += elapsed
+        self.max_tick_seconds = max(self.max_tick_seconds, elapsed)
+        if delays and self._after_id is None:
+            self._after_id = self.root.after(max(1, min(delays)), self._tick)
+
+    def _run(self, name, job):
+        # One failing job must not stop the loop for the others; it is tried again on the next tick
+        try:
+            return job()
+        except Exception:
+            self.errors += 1
+            print(f"Tick job {name!r} failed:", file=sys.stderr)
+            traceback.print_exc()
+            return RETRY_MS
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "total_ms": self.tick_seconds * 1000,
+            "mean_ms": self.tick_seconds * 1000 / self.ticks if self.ticks else 0.0,
+            "max_ms": self.max_tick_seconds * 1000,
+            "errors": self.errors,
+            "jobs": sorted(self._jobs),
+        }
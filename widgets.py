@@ -0,0 +1,119 @@
+import tkinter as tk
+
+
+def sync_listbox(listbox, items):
+    """Make listbox show items, deleting and inserting only the rows that differ"""
+    current = listbox.get(0, tk.END)
+    items = list(items)
+
+    # Keep the common head and tail, replace only the middle
+    lo = 0
+    limit = min(len(current), len(items))
+    while lo < limit and current[lo] == items[lo]:
+        lo += 1
+    hi_current, hi_items = len(current), len(items)
+    while hi_current > lo and hi_items > lo and current[hi_current - 1] == items[hi_items - 1]:
+        hi_current -= 1
+        hi_items -= 1
+
+    if hi_current > lo:
+        listbox.delete(lo, hi_current - 1)
+    if hi_items > lo:
+        listbox.insert(lo, *items[lo:hi_items])
+
+
+def sync_combobox(combobox, values):
+    """Reconfigure the dropdown values only when they actually changed"""
+    values = tuple(values)
+    if tuple(combobox.tk.splitlist(combobox.cget('values'))) != values:
+        combobox.config(values=values)
+
+
+def count_widgets(widget):
+    """Number of live widgets in the tree under (and including) widget"""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+class VirtualList(tk.Frame):
+    """Scrollable multi-select list over a large sequence of keys.
+
+    Only the rows that fit in the visible window exist in the underlying Listbox;
+    scrolling re-renders that window from the source. format_row(key) gives a row's
+    text. Selection is tracked by key, so it survives scrolling and re-filtering.
+    """
+
+    def __init__(self, master, format_row, height=10, **listbox_options):
+        super().__init__(master)
+        self.format_row = format_row
+        self.source = []
+        self.top = 0
+        self.visible_keys = []
+        self.selected = set()
+
+        self.scrollbar = tk.Scrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = tk.Listbox(self, height=height, selectmode=tk.MULTIPLE,
+                                  exportselection=False, **listbox_options)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.listbox.bind('<<ListboxSelect>>', self._on_select)
+        self.listbox.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.listbox.bind('<Button-4>', lambda e: self.scroll(-1))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll(1))
+        self.listbox.bind('<Configure>', lambda e: self.render())
+
+    def set_source(self, source):
+        """Show a new sequence of keys; anything supporting len() and slicing works"""
+        self.source = source
+        self.render()
+
+    def visible_rows(self):
+        # Rows that fit in the current widget height (falls back to the requested height)
+        row_height = self.listbox.bbox(0)[3] if self.listbox.size() and self.listbox.bbox(0) else 0
+        if row_height:
+            return max(1, self.listbox.winfo_height() // row_height)
+        return int(self.listbox.cget('height'))
+
+    def render(self):
+        rows = self.visible_rows()
+        total = len(self.source)
+        self.top = max(0, min(self.top, total - rows))
+        keys = self.source[self.top:self.top + rows]
+        self.visible_keys = keys
+        sync_listbox(self.listbox, [self.format_row(key) for key in keys])
+        self.listbox.selection_clear(0, tk.END)
+        for i, key in enumerate(keys):
+            if key in self.selected:
+                self.listbox.selection_set(i)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll(self, rows):
+        self.top += rows
+        self.render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.top = int(float(amount) * len(self.source))
+        elif unit == 'pages':
+            self.top += int(amount) * self.visible_rows()
+        else:
+            self.top += int(amount)
+        self.render()
+
+    def _on_select(self, event):
+        chosen = set(self.listbox.curselection())
+        for i, key in enumerate(self.visible_keys):
+            if i in chosen:
+                self.selected.add(key)
+            else:
+                self.selected.discard(key)
+
+    def selected_keys(self):
+        return list(self.selected)
+
+    def clear_selection(self):
+        self.selected.clear()
+        self.render()